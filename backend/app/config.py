@@ -37,13 +37,33 @@ class Settings(BaseSettings):
 
     IMMICH_API_PATH: str
     IMMICH_API_KEY: str
-    
+    IMMICH_TIMEOUT_SECONDS: float = 15
+    IMMICH_CONNECT_TIMEOUT_SECONDS: float = 5
+    IMMICH_MAX_CONNECTIONS: int = 20
+    IMMICH_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    # Processes used for decoding/encoding frames (0 = one per CPU)
+    RENDER_WORKERS: int = 0
+
+    # Rendered-frame cache: LRU in memory, optionally spilled to FRAME_CACHE_DIR
+    FRAME_CACHE_MAX_ITEMS: int = 64
+    FRAME_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    FRAME_CACHE_DIR: str | None = None
+    FRAME_CACHE_DIR_MAX_BYTES: int = 512 * 1024 * 1024
+    # How long an album's asset list is trusted before revalidating with Immich
+    ALBUM_CACHE_TTL_SECONDS: int = 60
+    # Background rendering of each group's next frame
+    PRERENDER_ENABLED: bool = True
+    PRERENDER_INTERVAL_SECONDS: int = 30
+    PRERENDER_PROFILE_MAX_AGE_SECONDS: int = 60 * 60
+
     # Configs for the MQTT-tasker
     API_URL: str
     MQTT_BROKER : str
     MQTT_PORT : int
     MQTT_USER : str
     MQTT_PASSWORD : str
+    # Longest the tasker sleeps between checks of the next_rollover_at index
+    TASKER_MAX_SLEEP_SECONDS: int = 60
 
     @computed_field  # type: ignore[prop-decorator]
     @property
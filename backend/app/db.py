@@ -1,9 +1,12 @@
+from sqlalchemy import inspect, text
 from sqlmodel import Session, create_engine
 
 from app.config import settings
 import app.models
 
 engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+# Advisory lock held while migrate() runs
+MIGRATION_LOCK_KEY = 0x70686f74
 
 
 # make sure all SQLModel models are imported (app.models) before initializing DB
@@ -19,7 +22,29 @@ def init_db(session: Session) -> None:
 
     # This works because the models are already imported and registered from app.models
     SQLModel.metadata.create_all(engine)
-    pass
+    migrate(session)
+
+
+def migrate(session: Session) -> None:
+    """Bring tables created before a column was added up to date. Safe to rerun.
+
+    Run at API and tasker startup, since the models map the new columns.
+    """
+    if not inspect(engine).has_table("group"):
+        return  # Nothing to upgrade yet; init_db creates it up to date
+    # The API and the tasker start together; let one of them do the work
+    session.exec(text("SELECT pg_advisory_xact_lock(:key)").bindparams(key=MIGRATION_LOCK_KEY))
+    session.exec(text(
+        'ALTER TABLE "group" ADD COLUMN IF NOT EXISTS next_rollover_at TIMESTAMP WITHOUT TIME ZONE'
+    ))
+    session.exec(text(
+        'UPDATE "group" SET next_rollover_at = last_rollover + make_interval(mins => rollover_delay_minutes) '
+        'WHERE next_rollover_at IS NULL'
+    ))
+    session.exec(text(
+        'CREATE INDEX IF NOT EXISTS ix_group_next_rollover_at ON "group" (next_rollover_at)'
+    ))
+    session.commit()
 
 if __name__ == "__main__":
     from sqlmodel import Session
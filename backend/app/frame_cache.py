@@ -0,0 +1,173 @@
+import asyncio
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from app.config import settings
+
+
+class FrameCache:
+    """Bounded LRU cache of encoded frames.
+
+    Frames evicted from memory are spilled to `spill_dir` (when set), which
+    is itself bounded and evicted in LRU order. A frame found on disk is
+    promoted back to memory.
+
+    get/put are coroutines: the disk reads and writes run in a worker
+    thread, outside the lock, so a spill never stalls the event loop.
+    Frames being written out stay readable from memory until the file is
+    in place.
+    """
+
+    def __init__(self, max_items: int, max_bytes: int,
+                 spill_dir: str | None = None, spill_max_bytes: int = 0):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.spill_max_bytes = spill_max_bytes
+        self._frames: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._spilled: OrderedDict = OrderedDict()
+        self._spilled_bytes = 0
+        # Evicted frames whose spill file is still being written
+        self._spilling: dict = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    async def get(self, key) -> bytes | None:
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                self._frames.move_to_end(key)
+                self.hits += 1
+                return frame
+            frame = self._spilling.get(key)
+            if frame is not None:
+                self.hits += 1
+                return frame
+            if key not in self._spilled:
+                self.misses += 1
+                return None
+            # Claim the file so a concurrent get doesn't read it too
+            self._spilled_bytes -= self._spilled.pop(key)
+        frame = await asyncio.to_thread(self._read_spilled, key)
+        with self._lock:
+            if frame is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            evicted = self._store(key, frame)
+        await self._spill(evicted)
+        return frame
+
+    async def put(self, key, frame: bytes):
+        with self._lock:
+            evicted = self._store(key, frame)
+        await self._spill(evicted)
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._frames or key in self._spilling or key in self._spilled
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "items": len(self._frames),
+                "bytes": self._bytes,
+                "spilled_items": len(self._spilled),
+                "spilled_bytes": self._spilled_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_evictions": self.disk_evictions,
+            }
+
+    def _store(self, key, frame: bytes) -> list:
+        """Insert under the lock. Returns the evicted (key, frame) pairs to spill."""
+        old = self._frames.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old)
+        self._frames[key] = frame
+        self._bytes += len(frame)
+        evicted = []
+        while self._frames and (len(self._frames) > self.max_items
+                                or self._bytes > self.max_bytes):
+            old_key, old_frame = self._frames.popitem(last=False)
+            self._bytes -= len(old_frame)
+            self.evictions += 1
+            if self.spill_dir and old_key not in self._spilled and old_key not in self._spilling:
+                self._spilling[old_key] = old_frame
+                evicted.append((old_key, old_frame))
+        return evicted
+
+    async def _spill(self, evicted: list):
+        if evicted:
+            await asyncio.to_thread(self._write_spilled, evicted)
+
+    def _spill_path(self, key) -> str:
+        name = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.spill_dir, f"{name}.frame")
+
+    def _write_spilled(self, evicted: list):
+        """Worker thread: write evicted frames, then trim the spill directory."""
+        for key, frame in evicted:
+            try:
+                with open(self._spill_path(key), "wb") as f:
+                    f.write(frame)
+                written = True
+            except OSError as e:
+                print(e)
+                written = False
+            with self._lock:
+                self._spilling.pop(key, None)
+                if written and key not in self._frames:
+                    self._spilled[key] = len(frame)
+                    self._spilled_bytes += len(frame)
+                    written = False
+            if written:
+                # Promoted back to memory while being written
+                self._remove_spilled(key)
+        stale = []
+        with self._lock:
+            while self._spilled and self._spilled_bytes > self.spill_max_bytes:
+                old_key, size = self._spilled.popitem(last=False)
+                self._spilled_bytes -= size
+                self.disk_evictions += 1
+                stale.append(old_key)
+        for old_key in stale:
+            self._remove_spilled(old_key)
+
+    def _read_spilled(self, key) -> bytes | None:
+        """Worker thread: read a claimed spill file and delete it."""
+        path = self._spill_path(key)
+        try:
+            with open(path, "rb") as f:
+                frame = f.read()
+            os.remove(path)
+            return frame
+        except OSError as e:
+            print(e)
+            return None
+
+    def _remove_spilled(self, key):
+        try:
+            os.remove(self._spill_path(key))
+        except OSError:
+            pass
+
+
+frame_cache = FrameCache(
+    max_items=settings.FRAME_CACHE_MAX_ITEMS,
+    max_bytes=settings.FRAME_CACHE_MAX_BYTES,
+    spill_dir=settings.FRAME_CACHE_DIR,
+    spill_max_bytes=settings.FRAME_CACHE_DIR_MAX_BYTES,
+)
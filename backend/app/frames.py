@@ -0,0 +1,107 @@
+import asyncio
+import hashlib
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from app.config import settings
+from app.frame_cache import frame_cache
+from app.immich import fetch_preview
+from app.render import DEFAULT_PROFILE, RENDER_VERSION, RenderProfile, render_frame
+from app.singleflight import SingleFlight
+
+# Profiles devices asked for recently, so the pre-renderer warms those
+_recent_profiles: dict[RenderProfile, float] = {}
+_profiles_lock = threading.Lock()
+
+_render_pool: ProcessPoolExecutor | None = None
+
+# Concurrent requests for the same (asset, profile) share one fetch + render
+render_flights = SingleFlight()
+
+
+def get_render_pool() -> ProcessPoolExecutor:
+    """Worker processes for decode/resize/encode, keeping PIL off the event loop."""
+    global _render_pool
+    if _render_pool is None:
+        _render_pool = ProcessPoolExecutor(
+            max_workers=settings.RENDER_WORKERS or None,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _render_pool
+
+
+def shutdown_render_pool():
+    global _render_pool
+    if _render_pool is not None:
+        _render_pool.shutdown(cancel_futures=True)
+        _render_pool = None
+
+
+async def run_in_render_pool(fn, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_render_pool(), fn, *args)
+
+
+async def render_asset(image_id, profile: RenderProfile = DEFAULT_PROFILE) -> bytes:
+    data = await fetch_preview(image_id)
+    return await run_in_render_pool(render_frame, data, profile)
+
+
+async def _render_into_cache(image_id, profile: RenderProfile) -> bytes:
+    frame = await render_asset(image_id, profile)
+    await frame_cache.put((image_id, profile), frame)
+    return frame
+
+
+async def get_frame(image_id, profile: RenderProfile = DEFAULT_PROFILE) -> bytes:
+    key = (image_id, profile)
+    frame = await frame_cache.get(key)
+    if frame is None:
+        frame = await render_flights.do(key, _render_into_cache, image_id, profile)
+    return frame
+
+
+async def cached_frame(image_id, profile: RenderProfile = DEFAULT_PROFILE) -> bytes | None:
+    """The frame if it is already rendered, without rendering or counting a miss."""
+    key = (image_id, profile)
+    return await frame_cache.get(key) if key in frame_cache else None
+
+
+async def warm_frame(image_id, profile: RenderProfile = DEFAULT_PROFILE) -> bool:
+    """Render a frame into the cache unless it is already there."""
+    key = (image_id, profile)
+    if key in frame_cache:
+        return False
+    await render_flights.do(key, _render_into_cache, image_id, profile)
+    return True
+
+
+def frame_etag(image_id, profile: RenderProfile = DEFAULT_PROFILE) -> str:
+    """Strong validator for a frame: same asset, profile and renderer, same bytes."""
+    digest = hashlib.sha1(repr((RENDER_VERSION, image_id, profile)).encode()).hexdigest()
+    return f'"{digest[:24]}"'
+
+
+def etag_matches(etag: str, if_none_match: str | None) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def note_profile(profile: RenderProfile):
+    with _profiles_lock:
+        _recent_profiles[profile] = time.monotonic()
+
+
+def recent_profiles(max_age: float) -> list[RenderProfile]:
+    now = time.monotonic()
+    with _profiles_lock:
+        for profile, seen in list(_recent_profiles.items()):
+            if now - seen > max_age:
+                del _recent_profiles[profile]
+        return list(_recent_profiles)
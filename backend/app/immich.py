@@ -0,0 +1,172 @@
+import datetime
+import threading
+import time
+
+import httpx
+
+from app.config import settings
+from app.singleflight import SingleFlight
+
+_client: httpx.AsyncClient | None = None
+
+
+class ImmichError(Exception):
+    pass
+
+
+def create_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=settings.IMMICH_API_PATH,
+        headers={"x-api-key": settings.IMMICH_API_KEY},
+        timeout=httpx.Timeout(settings.IMMICH_TIMEOUT_SECONDS, connect=settings.IMMICH_CONNECT_TIMEOUT_SECONDS),
+        limits=httpx.Limits(
+            max_connections=settings.IMMICH_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.IMMICH_MAX_KEEPALIVE_CONNECTIONS,
+        ),
+    )
+
+
+def get_client() -> httpx.AsyncClient:
+    """Process-wide keep-alive client, created on first use in the running loop."""
+    global _client
+    if _client is None:
+        _client = create_client()
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def fetch_preview(image_id: str, client: httpx.AsyncClient | None = None) -> bytes:
+    client = client or get_client()
+    response = await client.get(f"/assets/{image_id}/thumbnail", params={"size": "preview"})
+    if response.status_code != 200:
+        raise ImmichError("Image not found at the provided URL")
+    return response.content
+
+
+class AlbumEntry:
+    def __init__(self, asset_ids: list[str], etag: str | None, last_modified: str | None):
+        self.asset_ids = asset_ids
+        self.etag = etag
+        self.last_modified = last_modified
+        self.touch()
+
+    def touch(self):
+        self.checked_at = time.monotonic()
+        self.checked_wall = datetime.datetime.now()
+
+
+class AlbumCache:
+    """Per-album cache of the ordered asset id list.
+
+    Entries are trusted for `ttl` seconds, after which they are revalidated
+    with If-None-Match/If-Modified-Since so an unchanged album costs a 304
+    instead of the full asset JSON. Callers pass `not_before` (the group's
+    last rollover) so an album is revalidated once after the tasker
+    advances a group that uses it.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._albums: dict[str, AlbumEntry] = {}
+        self._counts: dict[str, tuple[int, float]] = {}
+        self._lock = threading.Lock()
+        self.flights = SingleFlight()
+        self.hits = 0
+        self.revalidated = 0
+        self.fetches = 0
+
+    def _is_fresh(self, entry: AlbumEntry, not_before: datetime.datetime | None) -> bool:
+        if time.monotonic() - entry.checked_at > self.ttl:
+            return False
+        return not_before is None or entry.checked_wall >= not_before
+
+    async def get_asset_ids(self, album_id: str, not_before: datetime.datetime | None = None,
+                            client: httpx.AsyncClient | None = None) -> list[str]:
+        with self._lock:
+            entry = self._albums.get(album_id)
+            if entry is not None and self._is_fresh(entry, not_before):
+                self.hits += 1
+                return entry.asset_ids
+        entry = await self.flights.do(("album", album_id), self._refresh_album, client or get_client(), album_id)
+        return entry.asset_ids
+
+    async def get_asset_count(self, album_id: str, client: httpx.AsyncClient | None = None) -> int:
+        """Number of assets in the album, without downloading the asset list
+        unless it is already cached."""
+        with self._lock:
+            entry = self._albums.get(album_id)
+            if entry is not None and self._is_fresh(entry, None):
+                self.hits += 1
+                return len(entry.asset_ids)
+            cached = self._counts.get(album_id)
+            if cached is not None and time.monotonic() - cached[1] <= self.ttl:
+                self.hits += 1
+                return cached[0]
+        return await self.flights.do(("count", album_id), self._refresh_count, client or get_client(), album_id)
+
+    def invalidate(self, album_id: str):
+        with self._lock:
+            entry = self._albums.get(album_id)
+            if entry is not None:
+                # Keep the validators around so the next fetch can still be a 304
+                entry.checked_at = float("-inf")
+            self._counts.pop(album_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "albums": len(self._albums),
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "fetches": self.fetches,
+                "single_flight": self.flights.stats(),
+            }
+
+    async def _refresh_album(self, client: httpx.AsyncClient, album_id: str) -> AlbumEntry:
+        with self._lock:
+            entry = self._albums.get(album_id)
+        entry = await self._fetch_album(client, album_id, entry)
+        with self._lock:
+            self._albums[album_id] = entry
+        return entry
+
+    async def _refresh_count(self, client: httpx.AsyncClient, album_id: str) -> int:
+        count = await self._fetch_count(client, album_id)
+        with self._lock:
+            self._counts[album_id] = (count, time.monotonic())
+        return count
+
+    async def _fetch_album(self, client: httpx.AsyncClient, album_id: str, entry: AlbumEntry | None) -> AlbumEntry:
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        response = await client.get(f"/albums/{album_id}", headers=headers)
+        if response.status_code == 304 and entry is not None:
+            with self._lock:
+                self.revalidated += 1
+            entry.touch()
+            return entry
+        if response.status_code != 200:
+            raise ImmichError(f"Error fetching album {album_id}: {response.status_code}")
+        with self._lock:
+            self.fetches += 1
+        asset_ids = [asset['id'] for asset in response.json()['assets']]
+        return AlbumEntry(asset_ids, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+
+    async def _fetch_count(self, client: httpx.AsyncClient, album_id: str) -> int:
+        response = await client.get(f"/albums/{album_id}", params={"withoutAssets": "true"})
+        if response.status_code != 200:
+            raise ImmichError(f"Error fetching album {album_id}: {response.status_code}")
+        return response.json()['assetCount']
+
+
+album_cache = AlbumCache(ttl=settings.ALBUM_CACHE_TTL_SECONDS)
@@ -1,14 +1,33 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from sqlmodel import Session
 from starlette.middleware.cors import CORSMiddleware
 
 from app.routes import router
 from app.config import settings
+from app.db import engine, migrate
+from app.frames import shutdown_render_pool
+from app.immich import close_client
+from app.prerender import prerenderer
+
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    with Session(engine) as session:
+        migrate(session)
+    if settings.PRERENDER_ENABLED:
+        prerenderer.start()
+    yield
+    await prerenderer.stop()
+    await close_client()
+    shutdown_render_pool()
 
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"/openapi.json"
+    openapi_url=f"/openapi.json",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -11,6 +11,9 @@ class Group(SQLModel, table=True):
     last_skip_request: datetime = Field(nullable=False)
     random_seed: int = Field(nullable=False, default=0)
     rollover_delay_minutes: int = Field(nullable=False, default=5)
+    # last_rollover + rollover_delay_minutes, kept by the tasker so due groups come from an index.
+    # Edits to either column made directly in the DB are picked up on the tasker's next tick.
+    next_rollover_at: datetime | None = Field(default=None, index=True)
 
 class Device(SQLModel, table=True):
     id: str | None = Field(default=None, primary_key=True)
@@ -0,0 +1,61 @@
+_MASK64 = (1 << 64) - 1
+# Seeds live in an INTEGER column
+_SEED_MASK = (1 << 31) - 1
+# a % 4 == 1 and an odd increment give an LCG mod 2**31 a full period
+_SEED_MULTIPLIER = 1103515245
+_FEISTEL_ROUNDS = 4
+
+
+def _mix64(x):
+    # splitmix64 finalizer
+    x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9 & _MASK64
+    x = (x ^ (x >> 27)) * 0x94D049BB133111EB & _MASK64
+    return x ^ (x >> 31)
+
+
+def _round_keys(seed):
+    return [_mix64((seed * _FEISTEL_ROUNDS + i + 1) * 0x9E3779B97F4A7C15 & _MASK64)
+            for i in range(_FEISTEL_ROUNDS)]
+
+
+def translate_asset_id(asset_index, seed, asset_count):
+    """Map a position in the shuffled cycle to an asset index.
+
+    A seeded Feistel network is a bijection on [0, 4**k) with 4**k < 4 *
+    asset_count; cycle-walking (re-encrypting until the value falls inside
+    [0, asset_count)) restricts it to a bijection on the album, so every
+    asset is visited exactly once per cycle. Runs in O(1) memory and an
+    expected O(1) time, without materializing the shuffled list.
+    """
+    if not 0 <= asset_index < asset_count:
+        raise IndexError("asset index out of range")
+    half_bits = ((asset_count - 1).bit_length() + 1) // 2 or 1
+    half_mask = (1 << half_bits) - 1
+    keys = _round_keys(seed)
+    x = asset_index
+    while True:
+        left, right = x >> half_bits, x & half_mask
+        for key in keys:
+            left, right = right, left ^ (_mix64(right ^ key) & half_mask)
+        x = (left << half_bits) | right
+        if x < asset_count:
+            return x
+
+
+def next_seed(seed, group_id):
+    """Seed of the reshuffle after `seed`.
+
+    Derived from the previous seed so the order after a reshuffle is known
+    ahead of time and the next frame can be pre-rendered. Each group steps
+    through all 2**31 seeds before one repeats, along its own sequence.
+    """
+    increment = (_mix64(group_id or 0) << 1 | 1) & _SEED_MASK
+    return (seed * _SEED_MULTIPLIER + increment) & _SEED_MASK
+
+
+def next_position(current_asset, seed, asset_count, group_id):
+    """Return the (current_asset, random_seed) pair that follows a rollover."""
+    current_asset = (current_asset + 1) % asset_count
+    if current_asset == 0:
+        seed = next_seed(seed, group_id)
+    return current_asset, seed
@@ -0,0 +1,91 @@
+import asyncio
+import datetime
+
+from sqlmodel import Session, select
+
+from app.config import settings
+from app.db import engine
+from app.frame_cache import frame_cache
+from app.frames import recent_profiles, warm_frame
+from app.immich import album_cache
+from app.models import Group
+from app.playlist import next_position, translate_asset_id
+from app.render import DEFAULT_PROFILE
+
+
+def load_due_groups(before: datetime.datetime, limit: int) -> list[Group]:
+    """Groups that roll over before `before`, soonest first."""
+    statement = (
+        select(Group)
+        .where(Group.next_rollover_at <= before)
+        .order_by(Group.next_rollover_at)
+        .limit(limit)
+    )
+    with Session(engine) as session:
+        return list(session.exec(statement).all())
+
+
+class PreRenderer:
+    """Background task that renders upcoming frames ahead of time.
+
+    The next asset is fully determined by the group's current_asset and
+    random_seed, so by the time the tasker publishes RENEW the burst of
+    device requests that follows is served from the frame cache. Only
+    groups due before the pass after next are warmed, and at most half the
+    frame cache is used, so warming never evicts the frames being served
+    or the ones warmed by the previous pass.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.rendered = 0
+        self.errors = 0
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {"rendered": self.rendered, "errors": self.errors}
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                print(e)
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self):
+        profiles = recent_profiles(settings.PRERENDER_PROFILE_MAX_AGE_SECONDS) or [DEFAULT_PROFILE]
+        limit = frame_cache.max_items // 2 // len(profiles)
+        if limit == 0:
+            return
+        horizon = datetime.datetime.now() + datetime.timedelta(seconds=2 * self.interval)
+        groups = await asyncio.to_thread(load_due_groups, horizon, limit)
+        for group in groups:
+            try:
+                asset_ids = await album_cache.get_asset_ids(group.album_id)
+                if not asset_ids:
+                    continue
+                asset_count = len(asset_ids)
+                position, seed = next_position(group.current_asset, group.random_seed, asset_count, group.id)
+                image_id = asset_ids[translate_asset_id(position, seed, asset_count)]
+                for profile in profiles:
+                    if await warm_frame(image_id, profile):
+                        self.rendered += 1
+            except Exception as e:
+                self.errors += 1
+                print(e)
+
+
+prerenderer = PreRenderer(interval=settings.PRERENDER_INTERVAL_SECONDS)
@@ -0,0 +1,210 @@
+import struct
+import zlib
+from functools import lru_cache
+from io import BytesIO
+from typing import NamedTuple
+
+from PIL import Image, ImageChops, ImageStat
+import qrcode
+
+BMP = "image/bmp"
+# Raw big-endian RGB565, top row first, packed for the panel's BGR mode
+# (blue in the high bits). Goes straight from the socket to the display.
+RGB565 = "image/x-rgb565"
+# 256-colour adaptive palette (256 RGB565 entries packed like RGB565 above,
+# 512 bytes) followed by one palette index per pixel, top row first
+INDEXED = "image/x-rgb565-indexed"
+# Same pixels as RGB565 in three passes so the device can show a coarse
+# frame early: the even rows at half resolution (2x2 box average, drawn as
+# 2x2 blocks), then the odd rows, then the even rows at full resolution.
+# 1.25x the bytes of RGB565.
+PROGRESSIVE = "image/x-rgb565-progressive"
+
+# Part of every frame ETag. Devices keep frames on flash and revalidate them
+# with If-None-Match, so bump this whenever the same asset and profile would
+# render to different bytes (encoder, letterbox, contrast/brightness LUT...)
+RENDER_VERSION = 1
+
+# In order of preference when the client accepts several
+MEDIA_TYPES = (RGB565, INDEXED, PROGRESSIVE, BMP)
+
+# Content-Encoding for frames. The small window lets the device inflate
+# with a 1 KB buffer; only raw pixel formats are worth compressing
+DEFLATE = "deflate"
+DEFLATE_WBITS = 10
+COMPRESSIBLE = (RGB565, INDEXED, PROGRESSIVE)
+
+# QR module matrix: one byte with the side N (border included), then N rows
+# of ceil(N / 8) bytes, MSB first, 1 = dark module
+QR_MATRIX = "application/x-qr-matrix"
+
+
+class RenderProfile(NamedTuple):
+    """Everything that changes the bytes of a rendered frame.
+
+    Two requests with the same asset and the same profile get the exact
+    same frame, so the profile is part of the frame cache key.
+    """
+    width: int = 320
+    height: int = 240
+    contrast: float = 1.2
+    brightness: float = 0.8
+    media_type: str = BMP
+    content_encoding: str | None = None
+
+
+DEFAULT_PROFILE = RenderProfile()
+
+
+def _accepted_types(accept: str) -> set[str]:
+    accepted = set()
+    for media_range in accept.split(","):
+        name, _, params = media_range.partition(";")
+        if params.replace(" ", "") not in ("q=0", "q=0.0"):
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def accepts(accept: str | None, media_type: str) -> bool:
+    """Whether the Accept header lists exactly `media_type` (with q > 0)."""
+    return bool(accept) and media_type in _accepted_types(accept)
+
+
+def negotiate_media_type(accept: str | None) -> str:
+    if accept:
+        accepted = _accepted_types(accept)
+        for media_type in MEDIA_TYPES:
+            if media_type in accepted:
+                return media_type
+    return BMP
+
+
+def negotiate_encoding(accept_encoding: str | None, media_type: str) -> str | None:
+    if not accept_encoding or media_type not in COMPRESSIBLE:
+        return None
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        if name.strip() == DEFLATE and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            return DEFLATE
+    return None
+
+
+def encode_bmp(image: Image.Image) -> bytes:
+    # BMP rows are stored bottom-up and the device draws them in stream
+    # order, so flip vertically (what rotate(180) + mirror used to do)
+    image = image.transpose(Image.Transpose.FLIP_TOP_BOTTOM)
+    byte_io = BytesIO()
+    image.save(byte_io, format="BMP")
+    return byte_io.getvalue()
+
+
+def encode_rgb565(image: Image.Image) -> bytes:
+    r, g, b = image.split()
+    high = ImageChops.add(b.point(lambda v: v & 0xF8), g.point(lambda v: v >> 5))
+    low = ImageChops.add(g.point(lambda v: (v & 0x1C) << 3), r.point(lambda v: v >> 3))
+    return Image.merge("LA", (high, low)).tobytes()
+
+
+def encode_indexed(image: Image.Image) -> bytes:
+    # Adaptive palette first, then Floyd-Steinberg error diffusion against it
+    # (PIL only dithers when quantizing to a given palette)
+    palette_image = image.quantize(256, method=Image.Quantize.MEDIANCUT)
+    indexed = image.quantize(palette=palette_image, dither=Image.Dither.FLOYDSTEINBERG)
+    palette = palette_image.getpalette()[:768]
+    palette += [0] * (768 - len(palette))
+    packed = bytearray(512)
+    for i in range(256):
+        r, g, b = palette[3 * i:3 * i + 3]
+        packed[2 * i] = (b & 0xF8) | (g >> 5)
+        packed[2 * i + 1] = ((g & 0x1C) << 3) | (r >> 3)
+    return bytes(packed) + indexed.tobytes()
+
+
+def encode_progressive(image: Image.Image) -> bytes:
+    row_size = image.width * 2
+    full = encode_rgb565(image)
+    passes = [encode_rgb565(image.reduce(2))]
+    passes.extend(full[y * row_size:(y + 1) * row_size] for y in range(1, image.height, 2))
+    passes.extend(full[y * row_size:(y + 1) * row_size] for y in range(0, image.height, 2))
+    return b"".join(passes)
+
+
+ENCODERS = {
+    BMP: encode_bmp,
+    RGB565: encode_rgb565,
+    INDEXED: encode_indexed,
+    PROGRESSIVE: encode_progressive,
+}
+
+
+def _float32(x: float) -> float:
+    return struct.unpack("f", struct.pack("f", x))[0]
+
+
+def enhance_lut(mean: int, contrast: float, brightness: float) -> list[int]:
+    """ImageEnhance.Contrast followed by ImageEnhance.Brightness as one table.
+
+    Both are Image.blend calls, which PIL computes in single precision and
+    truncates, so the table does the same to reproduce the two passes exactly.
+    """
+    contrast = _float32(contrast)
+    brightness = _float32(brightness)
+    lut = []
+    for v in range(256):
+        c = min(255, max(0, int(_float32(mean + _float32(contrast * (v - mean))))))
+        lut.append(min(255, max(0, int(_float32(brightness * c)))))
+    return lut
+
+
+def render_frame(data: bytes, profile: RenderProfile = DEFAULT_PROFILE) -> bytes:
+    image = Image.open(BytesIO(data))
+    # For JPEGs, let the decoder scale down (1/2, 1/4, 1/8) while decoding
+    image.draft("RGB", (profile.width, profile.height))
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    image.thumbnail((profile.width, profile.height))
+    # Same mean ImageEnhance.Contrast uses
+    mean = int(ImageStat.Stat(image.convert("L")).mean[0] + 0.5)
+    image = image.point(enhance_lut(mean, profile.contrast, profile.brightness) * 3)
+    if image.size != (profile.width, profile.height):
+        # Cropping past the edges pads with black, which letterboxes the
+        # image without a separate canvas and paste
+        x_offset = (profile.width - image.width) // 2
+        y_offset = (profile.height - image.height) // 2
+        image = image.crop((-x_offset, -y_offset, profile.width - x_offset, profile.height - y_offset))
+    frame = ENCODERS[profile.media_type](image)
+    if profile.content_encoding == DEFLATE:
+        compressor = zlib.compressobj(9, zlib.DEFLATED, DEFLATE_WBITS)
+        frame = compressor.compress(frame) + compressor.flush()
+    return frame
+
+
+def build_qr_url(url) -> bytes:
+    # Generate a QR code for the given URL
+    qr = qrcode.QRCode(box_size=10, border=1)
+    qr.add_data(url)
+    qr.make(fit=True)
+    # Create the image of the QR code
+    qr_image = qr.make_image(fill="black", back_color="white").convert("RGB")
+    qr_image = qr_image.resize((240, 240))
+    # Convert the QR code image to BMP format
+    byte_io = BytesIO()
+    qr_image.save(byte_io, format="BMP")
+    return byte_io.getvalue()
+
+
+@lru_cache(maxsize=256)
+def build_qr_matrix(url) -> bytes:
+    qr = qrcode.QRCode(border=1)
+    qr.add_data(url)
+    qr.make(fit=True)
+    matrix = qr.get_matrix()
+    packed = bytearray([len(matrix)])
+    for row in matrix:
+        for i in range(0, len(row), 8):
+            byte = 0
+            for bit, dark in enumerate(row[i:i + 8]):
+                if dark:
+                    byte |= 0x80 >> bit
+            packed.append(byte)
+    return bytes(packed)
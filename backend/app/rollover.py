@@ -0,0 +1,49 @@
+import datetime
+import heapq
+
+
+class RolloverSchedule:
+    """Min-heap of group rollover deadlines, kept by the tasker so it can
+    sleep until the earliest one without querying for it.
+
+    The heap is filled once from the database and then updated with the
+    deadlines the tasker itself writes. Updating a group pushes a new entry
+    and leaves the old one in the heap; entries that no longer match the
+    group's current deadline are skipped when they reach the top (lazy
+    invalidation).
+    """
+
+    def __init__(self):
+        self._heap: list[tuple[datetime.datetime, int]] = []
+        self._deadlines: dict[int, datetime.datetime] = {}
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def update(self, group_id: int, deadline: datetime.datetime):
+        if self._deadlines.get(group_id) == deadline:
+            return
+        self._deadlines[group_id] = deadline
+        heapq.heappush(self._heap, (deadline, group_id))
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            # Too many stale entries, rebuild
+            self._heap = [(deadline, group_id) for group_id, deadline in self._deadlines.items()]
+            heapq.heapify(self._heap)
+
+    def _is_current(self, entry: tuple[datetime.datetime, int]) -> bool:
+        return self._deadlines.get(entry[1]) == entry[0]
+
+    def next_deadline(self) -> datetime.datetime | None:
+        heap = self._heap
+        while heap and not self._is_current(heap[0]):
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def drop_due(self, now: datetime.datetime):
+        """Forget every deadline that has passed. The groups still due are
+        claimed from the database, which hands back their next deadline."""
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            if self._is_current(entry):
+                del self._deadlines[entry[1]]
@@ -1,19 +1,20 @@
-from fastapi import Depends, HTTPException, APIRouter, Header
+from fastapi import Depends, HTTPException, APIRouter, Header, Request
 from typing import Annotated
 
 from fastapi.responses import Response
-from io import BytesIO
-from PIL import Image, ImageEnhance, ImageOps
-import requests
-import qrcode
 from collections.abc import Generator
 from sqlmodel import Session, select
-import random
+import asyncio
 import datetime
 
 from app.models import Device, Group
-from app.config import settings
 from app.db import engine
+from app.frame_cache import frame_cache
+from app.frames import cached_frame, etag_matches, frame_etag, get_frame, note_profile, render_flights, run_in_render_pool
+from app.immich import ImmichError, album_cache
+from app.playlist import translate_asset_id
+from app.prerender import prerenderer
+from app.render import QR_MATRIX, DEFAULT_PROFILE, accepts, build_qr_matrix, build_qr_url, negotiate_encoding, negotiate_media_type
 
 
 router = APIRouter(prefix="")
@@ -28,72 +29,54 @@ def get_group_by_machine(session: Session, machine: str) -> Group:
     statement = select(Group).where(Device.id == machine, Group.id == Device.group_id)
     return session.exec(statement).one()
 
-def fetch_image_from_immich(image_url):
-    response = requests.get(image_url, stream=True, headers={"x-api-key": settings.IMMICH_API_KEY})
-    if response.status_code != 200:
-        raise HTTPException(status_code=404, detail="Image not found at the provided URL")
-    image = Image.open(response.raw).convert("RGB")
-    image.thumbnail((320, 240))
-    image = image.rotate(180)
-    image = ImageOps.mirror(image)
-    enhancer = ImageEnhance.Contrast(image)
-    image = enhancer.enhance(1.2)  # Increase contrast by 20%
-    enhancer = ImageEnhance.Brightness(image)
-    image = enhancer.enhance(0.8)  # Increase brightness by 10%
-    new_image = Image.new("RGB", (320, 240), color="black")
-    # Paste the resized image onto the center of the black image
-    x_offset = (320 - image.width) // 2
-    y_offset = (240 - image.height) // 2
-    new_image.paste(image, (x_offset, y_offset))
-    byte_io = BytesIO()
-    new_image.save(byte_io, format="BMP")
-    byte_io.seek(0)
-    return byte_io
-
-
-def build_qr_url(url):
-    # Generate a QR code for the given URL
-    qr = qrcode.QRCode(box_size=10, border=1)
-    qr.add_data(url)
-    qr.make(fit=True)
-    # Create the image of the QR code
-    qr_image = qr.make_image(fill="black", back_color="white").convert("RGB")
-    qr_image = qr_image.resize((240, 240))
-    # Convert the QR code image to BMP format
-    byte_io = BytesIO()
-    qr_image.save(byte_io, format="BMP")
-    byte_io.seek(0)
-    return byte_io
-
-
-def translate_asset_id(asset_index, seed, asset_count):
-    shuffle_order = list(range(asset_count))
-    random.Random(seed).shuffle(shuffle_order)
-    return shuffle_order[asset_index]
-
-
-@router.get("/image")
+@router.api_route("/image", methods=["GET", "HEAD"])
 async def get_image(
+        request: Request,
         session: SessionDep, 
-        machine: Annotated[str, Header()]
+        machine: Annotated[str, Header()],
+        accept: Annotated[str | None, Header()] = None,
+        accept_encoding: Annotated[str | None, Header()] = None,
+        if_none_match: Annotated[str | None, Header()] = None
     ):
     try:
+        media_type = negotiate_media_type(accept)
+        profile = DEFAULT_PROFILE._replace(
+            media_type=media_type,
+            content_encoding=negotiate_encoding(accept_encoding, media_type),
+        )
+        note_profile(profile)
         # Fetch the image from the provided URL
         # print(machine)
         grp = get_group_by_machine(session, machine)
         device = session.get(Device, machine)
         device.last_request = datetime.datetime.now()
-        response = requests.get(f"{settings.IMMICH_API_PATH}/albums/{grp.album_id}", stream=True, headers={"x-api-key": settings.IMMICH_API_KEY})
-        if response.status_code != 200:
+        try:
+            asset_ids = await album_cache.get_asset_ids(grp.album_id, not_before=grp.last_rollover)
+        except ImmichError:
             raise HTTPException(status_code=404, detail="Error finding image ID")
-        album_assets = response.json()['assets']
-        asset_position = translate_asset_id(grp.current_asset, grp.random_seed, len(album_assets))
-        image_id = album_assets[asset_position]['id']
-        image_url = f'{settings.IMMICH_API_PATH}/assets/{image_id}/thumbnail?size=preview'
+        asset_position = translate_asset_id(grp.current_asset, grp.random_seed, len(asset_ids))
+        image_id = asset_ids[asset_position]
         session.add(device)
         session.add(grp)
         session.commit()
-        return Response(content=fetch_image_from_immich(image_url).getvalue(), media_type="image/bmp")
+        headers = {
+            "ETag": frame_etag(image_id, profile),
+            "Cache-Control": "no-cache",
+            "Vary": "Accept, Accept-Encoding",
+        }
+        if etag_matches(headers["ETag"], if_none_match):
+            return Response(status_code=304, headers=headers)
+        if profile.content_encoding:
+            headers["Content-Encoding"] = profile.content_encoding
+        if request.method == "HEAD":
+            # Headers only: give the length if the frame is rendered, never render it for this
+            frame = await cached_frame(image_id, profile)
+            response = Response(content=frame, media_type=profile.media_type, headers=headers)
+            if frame is None:
+                del response.headers["content-length"]
+            return response
+        frame = await get_frame(image_id, profile)
+        return Response(content=frame, media_type=profile.media_type, headers=headers)
     except Exception as e:
         print(e)
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
@@ -102,15 +85,28 @@ async def get_image(
 @router.get("/qrcode")
 async def get_qrcode(
         session: SessionDep, 
-        machine: Annotated[str, Header()]
+        machine: Annotated[str, Header()],
+        accept: Annotated[str | None, Header()] = None
     ):
     try:
         # print(machine)
         grp = get_group_by_machine(session, machine)
         # print(grp)
-        return Response(content=build_qr_url(grp.album_url).getvalue(), media_type="image/bmp")
+        if accepts(accept, QR_MATRIX):
+            matrix = await asyncio.to_thread(build_qr_matrix, grp.album_url)
+            return Response(content=matrix, media_type=QR_MATRIX)
+        qr_code = await run_in_render_pool(build_qr_url, grp.album_url)
+        return Response(content=qr_code, media_type="image/bmp")
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
-    
 
+
+@router.get("/stats")
+async def get_stats():
+    return {
+        "frame_cache": frame_cache.stats(),
+        "render_single_flight": render_flights.stats(),
+        "album_cache": album_cache.stats(),
+        "prerender": prerenderer.stats(),
+    }
@@ -0,0 +1,80 @@
+"""Per-frame CPU time and peak memory of the frame render pipeline.
+
+Compares the original multi-pass pipeline with app.render.render_frame on a
+synthetic Immich-sized JPEG preview. Each variant runs in its own process so
+peak RSS is measured independently.
+
+    cd backend && python -m benchmarks.bench_render [frames]
+"""
+import multiprocessing
+import resource
+import sys
+import time
+from io import BytesIO
+
+from PIL import Image, ImageEnhance, ImageOps
+
+from app.render import render_frame
+
+PREVIEW_SIZE = (1440, 1080)
+
+
+def make_preview() -> bytes:
+    noise = Image.effect_noise(PREVIEW_SIZE, 40)
+    gradient = Image.linear_gradient("L").resize(PREVIEW_SIZE)
+    image = Image.merge("RGB", (noise, gradient, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+    byte_io = BytesIO()
+    image.save(byte_io, format="JPEG", quality=85)
+    return byte_io.getvalue()
+
+
+def legacy_render_frame(data: bytes) -> bytes:
+    image = Image.open(BytesIO(data)).convert("RGB")
+    image.thumbnail((320, 240))
+    image = image.rotate(180)
+    image = ImageOps.mirror(image)
+    image = ImageEnhance.Contrast(image).enhance(1.2)
+    image = ImageEnhance.Brightness(image).enhance(0.8)
+    new_image = Image.new("RGB", (320, 240), color="black")
+    new_image.paste(image, ((320 - image.width) // 2, (240 - image.height) // 2))
+    byte_io = BytesIO()
+    new_image.save(byte_io, format="BMP")
+    return byte_io.getvalue()
+
+
+PIPELINES = {
+    "before": legacy_render_frame,
+    "after": render_frame,
+}
+
+
+def run(name, data, frames, results):
+    render = PIPELINES[name]
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    render(data)  # warm up decoders and plugin registration
+    start = time.process_time()
+    for _ in range(frames):
+        render(data)
+    cpu = (time.process_time() - start) / frames
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results[name] = (cpu, rss_after - rss_before, rss_after)
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    data = make_preview()
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Manager().dict()
+    for name in PIPELINES:
+        p = ctx.Process(target=run, args=(name, data, frames, results))
+        p.start()
+        p.join()
+    print(f"{frames} frames from a {PREVIEW_SIZE[0]}x{PREVIEW_SIZE[1]} JPEG ({len(data) // 1024} KB)")
+    print(f"{'pipeline':<10}{'cpu/frame':>12}{'peak rss +':>14}{'peak rss':>12}")
+    for name in PIPELINES:
+        cpu, rss_delta, rss = results[name]
+        print(f"{name:<10}{cpu * 1000:>10.2f}ms{rss_delta:>11} KB{rss:>9} KB")
+
+
+if __name__ == "__main__":
+    main()
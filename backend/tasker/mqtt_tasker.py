@@ -1,13 +1,16 @@
-from app.db import engine
+from app.db import engine, migrate
 from app.models import Device, Group, LoginRequest
 from app.config import settings
+from app.immich import album_cache, create_client
+from app.playlist import next_position
+from app.rollover import RolloverSchedule
+from sqlalchemy import func, update
 from sqlmodel import Session, select
 import paho.mqtt.client as mqtt
+import asyncio
 import datetime
-import time
-import requests
+import threading
 import json 
-import random
 from typing import List
 
 import logging
@@ -19,6 +22,9 @@ logger.setLevel(logging.WARN)
 switch_photo_requests = {}
 login_requests = {}
 reconnected = False
+# Set from the MQTT thread to wake the main loop before the next deadline
+wakeup = threading.Event()
+schedule = RolloverSchedule()
 
 
 def on_connect(client, userdata, flags, reason_code, properties):
@@ -26,6 +32,7 @@ def on_connect(client, userdata, flags, reason_code, properties):
     print(f"Connected with result code {reason_code}")
     client.subscribe("portrait/skip/#")
     reconnected = True
+    wakeup.set()
 
 
 def on_message(client, userdata, msg):
@@ -48,6 +55,7 @@ def on_message(client, userdata, msg):
                 login_requests[device_id] = True
             except IndexError :
                 print(f"Topic {topic} has invalid device_id")
+    wakeup.set()
 
 
 mqttc = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
@@ -70,41 +78,103 @@ def trigger_group_renew(group_id):
     mqttc.publish(f"portrait/group/{group_id}", "RENEW", qos=1)
 
 
-def set_next_asset_id(group: Group):
-    try:
-        response = requests.get(f"{settings.IMMICH_API_PATH}/albums/{group.album_id}?withoutAssets=true", stream=True, headers={"x-api-key": settings.IMMICH_API_KEY})
-        assetcount = response.json()['assetCount']
-        group.current_asset = (group.current_asset+1)%assetcount
-        if(group.current_asset == 0):
-            group.random_seed = random.randint(0,1000)
-        return group
-    except Exception as e:
-        print(e)
-        return group
+async def fetch_asset_counts(album_ids: List[str]) -> dict[str, int]:
+    """Asset count of each distinct album. Counts still fresh in album_cache
+    cost nothing; the rest are fetched concurrently over one pooled client."""
+    album_ids = list(dict.fromkeys(album_ids))
+    async with create_client() as client:
+        results = await asyncio.gather(
+            *(asyncio.wait_for(album_cache.get_asset_count(album_id, client=client),
+                               settings.IMMICH_TIMEOUT_SECONDS)
+              for album_id in album_ids),
+            return_exceptions=True,
+        )
+    counts = {}
+    for album_id, result in zip(album_ids, results):
+        if isinstance(result, BaseException):
+            print(f"Could not get the asset count of album {album_id}: {result!r}")
+        else:
+            counts[album_id] = result
+    return counts
+
+
+def next_asset_positions(groups: List[tuple[int, str, int, int]]) -> List[tuple[int, int]]:
+    """(current_asset, random_seed) after a rollover for each (group_id,
+    album_id, current_asset, random_seed). Groups whose album count is
+    unavailable keep their position."""
+    counts = asyncio.run(fetch_asset_counts([album_id for _, album_id, _, _ in groups]))
+    positions = []
+    for group_id, album_id, current_asset, random_seed in groups:
+        try:
+            positions.append(next_position(current_asset, random_seed, counts[album_id], group_id))
+        except (KeyError, ZeroDivisionError):
+            positions.append((current_asset, random_seed))
+    return positions
+
+
+def rollover_interval():
+    return func.make_interval(0, 0, 0, 0, 0, Group.rollover_delay_minutes)
 
 
 def skip_photos_from_groups(session: Session, groups: List[Group]):
     groups_to_skip = []
-    for group in groups:
+    positions = next_asset_positions([(group.id, group.album_id, group.current_asset, group.random_seed) for group in groups]) if groups else []
+    for group, (current_asset, random_seed) in zip(groups, positions):
         groups_to_skip.append(group.id)
         group.last_rollover = datetime.datetime.now()
-        group = set_next_asset_id(group)
+        group.next_rollover_at = group.last_rollover + datetime.timedelta(minutes=group.rollover_delay_minutes)
+        group.current_asset, group.random_seed = current_asset, random_seed
         session.add(group)
+        schedule.update(group.id, group.next_rollover_at)
     session.commit()
     for group_id in groups_to_skip:
         trigger_group_renew(group_id)
 
 
-# a cada 30 segundos, checa se passou o tempo necessário para atualizar as imagens
+# renova os grupos cujo next_rollover_at já passou
 def timeout_check(session: Session):
-    groups = session.exec(select(Group)).all()
     now = datetime.datetime.now()
-    groups_to_renew = []
-    for group in groups:
-        if(now - group.last_rollover > datetime.timedelta(minutes=group.rollover_delay_minutes)):
-            groups_to_renew.append(group)
-    skip_photos_from_groups(session, groups_to_renew)
-    
+    # Groups added, or whose last_rollover/rollover_delay_minutes were edited,
+    # outside the tasker get their deadline (re)computed. The comparison
+    # can't use the index, but it runs in the database and only rows that
+    # actually change come back.
+    deadline = Group.last_rollover + rollover_interval()
+    added = session.execute(
+        update(Group)
+        .where(Group.next_rollover_at.is_distinct_from(deadline))
+        .values(next_rollover_at=deadline)
+        .returning(Group.id, Group.next_rollover_at)
+        .execution_options(synchronize_session=False)
+    ).all()
+    # Claim every due group and move its deadline forward in one statement
+    due = session.execute(
+        update(Group)
+        .where(Group.next_rollover_at <= now)
+        .values(last_rollover=now, next_rollover_at=now + rollover_interval())
+        .returning(Group.id, Group.album_id, Group.current_asset, Group.random_seed, Group.next_rollover_at)
+        .execution_options(synchronize_session=False)
+    ).all()
+    # Release the row locks before asking Immich for the asset counts
+    session.commit()
+    # Past deadlines were either claimed above or belong to groups that
+    # were deleted or edited; either way the rows returned are the truth
+    schedule.drop_due(now)
+    for group_id, deadline in added:
+        schedule.update(group_id, deadline)
+    for row in due:
+        schedule.update(row.id, row.next_rollover_at)
+    if not due:
+        return
+    positions = next_asset_positions([tuple(row[:4]) for row in due])
+    # Bulk UPDATE by primary key
+    session.execute(update(Group), [
+        {"id": row[0], "current_asset": current_asset, "random_seed": random_seed}
+        for row, (current_asset, random_seed) in zip(due, positions)
+    ])
+    session.commit()
+    for group_id, *_ in due:
+        trigger_group_renew(group_id)
+
 
 def handle_login_requests(session: Session):
     global login_requests
@@ -135,19 +205,45 @@ def switch_photo_check(session: Session):
     
 
 
+def load_schedule(session: Session):
+    """Fill the schedule once; afterwards it follows the deadlines the tasker writes."""
+    for group_id, deadline in session.exec(select(Group.id, Group.next_rollover_at)
+                                           .where(Group.next_rollover_at.is_not(None))):
+        schedule.update(group_id, deadline)
+    session.commit()
+
+
+def seconds_until_next_deadline() -> float | None:
+    deadline = schedule.next_deadline()
+    if deadline is None:
+        return None
+    return max(0.0, (deadline - datetime.datetime.now()).total_seconds())
+
+
 def main(session: Session):
+    load_schedule(session)
     mqttc.loop_start()
     while 1:
         sub_to_machines(session)
         handle_login_requests(session)
         timeout_check(session)
         switch_photo_check(session)
-        time.sleep(2)
+        # Don't sit idle in a transaction while sleeping
+        session.commit()
+        # Sleep until the earliest rollover or an MQTT request. Groups edited
+        # outside the tasker are picked up from the index on the next wake.
+        timeout = settings.TASKER_MAX_SLEEP_SECONDS
+        until_deadline = seconds_until_next_deadline()
+        if until_deadline is not None:
+            timeout = min(timeout, until_deadline)
+        wakeup.wait(timeout)
+        wakeup.clear()
     mqttc.loop_stop()
     pass
 
 
 
 with Session(engine) as session:
+    migrate(session)
     main(session)
 
@@ -0,0 +1,16 @@
+import os
+
+# Required settings without defaults; the tests never reach these services
+for name, value in {
+    "PROJECT_NAME": "photomigo-test",
+    "POSTGRES_SERVER": "localhost",
+    "POSTGRES_USER": "test",
+    "IMMICH_API_PATH": "http://immich.invalid/api",
+    "IMMICH_API_KEY": "test",
+    "API_URL": "http://api.invalid",
+    "MQTT_BROKER": "localhost",
+    "MQTT_PORT": "1883",
+    "MQTT_USER": "test",
+    "MQTT_PASSWORD": "test",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from app.immich import AlbumCache, ImmichError
+
+WAITERS = 30
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, body: dict | None = None):
+        self.status_code = status_code
+        self.headers = {"ETag": '"v1"'}
+        self._body = body
+
+    def json(self) -> dict:
+        return self._body
+
+
+class CountingClient:
+    """Stands in for the Immich httpx client and counts upstream calls."""
+
+    def __init__(self, status_code: int = 200):
+        self.status_code = status_code
+        self.calls = 0
+
+    async def get(self, url, **kwargs):
+        self.calls += 1
+        # Let every waiter pile up on the in-flight call
+        await asyncio.sleep(0.01)
+        return FakeResponse(self.status_code, {"assets": [{"id": "a"}, {"id": "b"}], "assetCount": 2})
+
+
+def gather_asset_ids(cache: AlbumCache, client: CountingClient):
+    async def run():
+        return await asyncio.gather(
+            *(cache.get_asset_ids("album", client=client) for _ in range(WAITERS)),
+            return_exceptions=True,
+        )
+    return asyncio.run(run())
+
+
+def test_concurrent_misses_share_one_upstream_call():
+    cache = AlbumCache(ttl=60)
+    client = CountingClient()
+    results = gather_asset_ids(cache, client)
+    assert client.calls == 1
+    assert results == [["a", "b"]] * WAITERS
+    assert cache.flights.stats()["deduplicated"] == WAITERS - 1
+
+
+def test_upstream_error_reaches_every_waiter():
+    cache = AlbumCache(ttl=60)
+    client = CountingClient(status_code=500)
+    results = gather_asset_ids(cache, client)
+    assert client.calls == 1
+    assert len(results) == WAITERS
+    assert all(isinstance(result, ImmichError) for result in results)
+
+
+def test_fresh_entry_is_served_without_upstream_call():
+    cache = AlbumCache(ttl=60)
+    client = CountingClient()
+    gather_asset_ids(cache, client)
+    assert asyncio.run(cache.get_asset_ids("album", client=client)) == ["a", "b"]
+    assert client.calls == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_concurrent_count_misses_share_one_upstream_call():
+    cache = AlbumCache(ttl=60)
+    client = CountingClient()
+
+    async def run():
+        return await asyncio.gather(*(cache.get_asset_count("album", client=client) for _ in range(WAITERS)))
+
+    assert asyncio.run(run()) == [2] * WAITERS
+    assert client.calls == 1
+
+
+@pytest.mark.parametrize("status_code", [404, 500])
+def test_errors_are_not_cached(status_code):
+    cache = AlbumCache(ttl=60)
+    client = CountingClient(status_code=status_code)
+    gather_asset_ids(cache, client)
+    gather_asset_ids(cache, client)
+    assert client.calls == 2
@@ -0,0 +1,73 @@
+import asyncio
+import os
+
+from app.frame_cache import FrameCache
+
+
+def frame(name: str, size: int = 10) -> bytes:
+    return name.encode() * size
+
+
+async def fill(cache: FrameCache, names: str):
+    for name in names:
+        await cache.put(name, frame(name))
+
+
+def test_least_recently_used_is_evicted():
+    cache = FrameCache(max_items=2, max_bytes=10**6)
+
+    async def run():
+        await fill(cache, "ab")
+        assert await cache.get("a") == frame("a")
+        await cache.put("c", frame("c"))
+        return await cache.get("b"), await cache.get("a"), await cache.get("c")
+
+    assert asyncio.run(run()) == (None, frame("a"), frame("c"))
+    stats = cache.stats()
+    assert (stats["items"], stats["bytes"], stats["evictions"]) == (2, 20, 1)
+    assert (stats["hits"], stats["misses"]) == (3, 1)
+
+
+def test_byte_budget_evicts():
+    cache = FrameCache(max_items=10, max_bytes=25)
+    asyncio.run(fill(cache, "abc"))
+    assert "a" not in cache
+    assert "b" in cache and "c" in cache
+    assert cache.stats()["bytes"] == 20
+
+
+def test_replacing_a_frame_keeps_the_byte_count():
+    cache = FrameCache(max_items=10, max_bytes=10**6)
+
+    async def run():
+        await cache.put("a", frame("a"))
+        await cache.put("a", frame("a", 4))
+        return await cache.get("a")
+
+    assert asyncio.run(run()) == frame("a", 4)
+    assert cache.stats()["bytes"] == 4
+
+
+def test_evicted_frames_spill_to_disk_and_come_back(tmp_path):
+    cache = FrameCache(max_items=1, max_bytes=10**6, spill_dir=str(tmp_path), spill_max_bytes=10**6)
+
+    async def run():
+        await fill(cache, "ab")
+        assert len(os.listdir(tmp_path)) == 1
+        return await cache.get("a")
+
+    assert asyncio.run(run()) == frame("a")
+    stats = cache.stats()
+    assert stats["disk_hits"] == 1
+    # "a" was promoted back, pushing "b" out to disk in its place
+    assert stats["spilled_items"] == 1 and "b" in cache
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_spill_directory_is_bounded(tmp_path):
+    cache = FrameCache(max_items=1, max_bytes=10**6, spill_dir=str(tmp_path), spill_max_bytes=25)
+    asyncio.run(fill(cache, "abcd"))
+    stats = cache.stats()
+    assert (stats["spilled_items"], stats["spilled_bytes"], stats["disk_evictions"]) == (2, 20, 1)
+    assert "a" not in cache
+    assert len(os.listdir(tmp_path)) == 2
@@ -0,0 +1,30 @@
+import pytest
+
+from app.frames import etag_matches, frame_etag
+from app.render import DEFAULT_PROFILE, RGB565
+
+ETAG = '"0123456789abcdef01234567"'
+
+
+@pytest.mark.parametrize("if_none_match, expected", [
+    (None, False),
+    ("", False),
+    ("*", True),
+    (" * ", True),
+    (ETAG, True),
+    (f"W/{ETAG}", True),
+    (f'"other", {ETAG}', True),
+    (f'"other",W/{ETAG}', True),
+    ('"other", W/"another"', False),
+    (ETAG.strip('"'), False),
+])
+def test_etag_matches(if_none_match, expected):
+    assert etag_matches(ETAG, if_none_match) is expected
+
+
+def test_frame_etag_depends_on_asset_and_profile():
+    etag = frame_etag("asset", DEFAULT_PROFILE)
+    assert etag == frame_etag("asset", DEFAULT_PROFILE)
+    assert etag != frame_etag("other", DEFAULT_PROFILE)
+    assert etag != frame_etag("asset", DEFAULT_PROFILE._replace(media_type=RGB565))
+    assert etag.startswith('"') and etag.endswith('"')
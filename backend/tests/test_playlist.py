@@ -0,0 +1,25 @@
+from app.playlist import next_position, next_seed, translate_asset_id
+
+
+def test_translate_is_a_permutation():
+    for asset_count in (1, 2, 7, 100, 1000):
+        order = [translate_asset_id(i, 42, asset_count) for i in range(asset_count)]
+        assert sorted(order) == list(range(asset_count))
+
+
+def test_seeds_do_not_cycle_early():
+    for group_id in (1, 2, 939):
+        seed, seen = 0, set()
+        for _ in range(10000):
+            assert seed not in seen
+            seen.add(seed)
+            seed = next_seed(seed, group_id)
+
+
+def test_groups_get_different_seeds():
+    assert next_seed(0, 1) != next_seed(0, 2)
+
+
+def test_next_position_reshuffles_at_the_end_of_a_cycle():
+    assert next_position(3, 5, 10, 1) == (4, 5)
+    assert next_position(9, 5, 10, 1) == (0, next_seed(5, 1))
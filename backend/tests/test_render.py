@@ -0,0 +1,33 @@
+import pytest
+
+from app.render import BMP, INDEXED, PROGRESSIVE, QR_MATRIX, RGB565, accepts, negotiate_media_type
+
+
+@pytest.mark.parametrize("media_type", [RGB565, INDEXED, PROGRESSIVE, BMP])
+def test_negotiate_exact_type(media_type):
+    assert negotiate_media_type(media_type) == media_type
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (f"{INDEXED}, {BMP}", INDEXED),
+    (f"{PROGRESSIVE};q=0.9, {BMP}", PROGRESSIVE),
+    (f"{BMP}, {INDEXED}, {RGB565}", RGB565),
+    (f"{RGB565};q=0, {INDEXED}", INDEXED),
+    ("image/x-rgb565-unknown", BMP),
+    ("*/*", BMP),
+    (None, BMP),
+])
+def test_negotiate_media_type(accept, expected):
+    assert negotiate_media_type(accept) == expected
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (QR_MATRIX, True),
+    (f"image/bmp, {QR_MATRIX};q=0.5", True),
+    (f"{QR_MATRIX};q=0", False),
+    (f"{QR_MATRIX}-v2", False),
+    ("*/*", False),
+    (None, False),
+])
+def test_accepts(accept, expected):
+    assert accepts(accept, QR_MATRIX) is expected
@@ -0,0 +1,57 @@
+import datetime
+
+from app.rollover import RolloverSchedule
+
+T0 = datetime.datetime(2026, 1, 1)
+
+
+def at(minutes: int) -> datetime.datetime:
+    return T0 + datetime.timedelta(minutes=minutes)
+
+
+def test_empty_schedule_has_no_deadline():
+    assert RolloverSchedule().next_deadline() is None
+
+
+def test_next_deadline_is_the_earliest():
+    schedule = RolloverSchedule()
+    for group_id, minutes in ((1, 30), (2, 10), (3, 20)):
+        schedule.update(group_id, at(minutes))
+    assert schedule.next_deadline() == at(10)
+    assert len(schedule) == 3
+
+
+def test_update_replaces_the_group_deadline():
+    schedule = RolloverSchedule()
+    schedule.update(1, at(10))
+    schedule.update(2, at(20))
+    schedule.update(1, at(30))
+    # The old entry for group 1 is stale and skipped
+    assert schedule.next_deadline() == at(20)
+    assert len(schedule) == 2
+
+
+def test_drop_due_forgets_passed_deadlines_only():
+    schedule = RolloverSchedule()
+    for group_id in range(10):
+        schedule.update(group_id, at(group_id))
+    schedule.drop_due(at(4))
+    assert len(schedule) == 5
+    assert schedule.next_deadline() == at(5)
+
+
+def test_drop_due_ignores_stale_entries():
+    schedule = RolloverSchedule()
+    schedule.update(1, at(1))
+    schedule.update(1, at(10))
+    schedule.drop_due(at(5))
+    assert len(schedule) == 1
+    assert schedule.next_deadline() == at(10)
+
+
+def test_stale_entries_are_compacted():
+    schedule = RolloverSchedule()
+    for minutes in range(1000):
+        schedule.update(1, at(minutes))
+    assert len(schedule._heap) <= 2 * len(schedule) + 64
+    assert schedule.next_deadline() == at(999)
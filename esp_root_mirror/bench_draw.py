@@ -0,0 +1,46 @@
+# Frame draw benchmark, run on the device with a 320x240 24-bit BMP on flash:
+#   import bench_draw; bench_draw.run("frame.bmp")
+# Compares the per-pixel read_pixels path against the readinto/viper path.
+import gc
+import time
+
+import parse_bitmap
+from ui_handler import spi1
+from ili9341 import Display
+from machine import Pin
+
+
+class _PixelsOnly:
+    """Hide readinto so draw_from_pixel_stream takes the per-pixel path."""
+
+    def __init__(self, reader):
+        self.read_pixels = reader.read_pixels
+
+
+def _measure(display, path, legacy):
+    with open(path, 'rb') as f:
+        gc.collect()
+        free_before = gc.mem_free()
+        start = time.ticks_ms()
+        reader = parse_bitmap.BMPStreamReader(f)
+        w, h = reader.width, reader.height
+        if legacy:
+            reader = _PixelsOnly(reader)
+        display.draw_from_pixel_stream(reader, 0, 0, w, h)
+        elapsed = time.ticks_diff(time.ticks_ms(), start)
+        free_after = gc.mem_free()
+    return elapsed, free_before - free_after
+
+
+def run(path="frame.bmp", repeats=3, display=None):
+    if display is None:
+        display = Display(spi1, dc=Pin(2), cs=Pin(15), rst=Pin(0), width=320, height=240, rotation=0)
+    for name, legacy in (("read_pixels", True), ("readinto", False)):
+        times = []
+        allocs = []
+        for _ in range(repeats):
+            elapsed, allocated = _measure(display, path, legacy)
+            times.append(elapsed)
+            allocs.append(allocated)
+        print("{}: best {} ms, avg {} ms, mem_free dropped by up to {} bytes".format(
+            name, min(times), sum(times) // repeats, max(allocs)))
@@ -0,0 +1,156 @@
+import binascii
+import hashlib
+import json
+import os
+
+INDEX_NAME = "index.json"
+TMP_NAME = "incoming.tmp"
+# Kept free on the filesystem after storing a frame
+MIN_FREE_BYTES = 64 * 1024
+
+
+class FrameCache():
+    """Raw RGB565 frames on flash, keyed by the server's ETag.
+
+    Holds at most `max_frames` frames and `max_bytes` bytes, evicting the
+    least recently used. The index (ETag, file, size; newest last) lives in
+    `index.json` next to the frames so it survives reboots.
+    """
+
+    def __init__(self, directory="/frames", max_frames=4, max_bytes=4 * 153600):
+        self.directory = directory
+        self.max_frames = max_frames
+        self.max_bytes = max_bytes
+        try:
+            os.mkdir(directory)
+        except OSError:
+            pass  # Already there
+        self.entries = self._load_index()
+
+    def _path(self, name):
+        return self.directory + "/" + name
+
+    def _load_index(self):
+        try:
+            with open(self._path(INDEX_NAME)) as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return []
+        # Drop entries whose file went missing (e.g. power loss mid write)
+        valid = []
+        for etag, name, size in entries:
+            try:
+                if os.stat(self._path(name))[6] == size:
+                    valid.append([etag, name, size])
+            except OSError:
+                pass
+        return valid
+
+    def _save_index(self):
+        with open(self._path(INDEX_NAME), "w") as f:
+            json.dump(self.entries, f)
+
+    def _find(self, etag):
+        if isinstance(etag, bytes):
+            etag = etag.decode()
+        for i, entry in enumerate(self.entries):
+            if entry[0] == etag:
+                return i
+        return -1
+
+    def etags(self):
+        """Cached ETags, newest first."""
+        return [entry[0] for entry in reversed(self.entries)]
+
+    def get(self, etag):
+        """Path of the frame stored under `etag` (now the newest), or None.
+
+        The index is only rewritten when the LRU order changes, so repeated
+        hits on the newest frame (every 304 for the frame on screen) cost
+        no flash writes.
+        """
+        i = self._find(etag)
+        if i < 0:
+            return None
+        if i != len(self.entries) - 1:
+            self.entries.append(self.entries.pop(i))
+            self._save_index()
+        return self._path(self.entries[-1][1])
+
+    def path(self, etag):
+        """Path of the frame stored under `etag`, or None, without touching it."""
+        i = self._find(etag)
+        return None if i < 0 else self._path(self.entries[i][1])
+
+    def newest(self):
+        """(etag, path) of the most recently used frame, or None."""
+        if not self.entries:
+            return None
+        etag, name, _ = self.entries[-1]
+        return etag, self._path(name)
+
+    def open_incoming(self):
+        """File to write a new frame into; finish with commit() or discard()."""
+        return open(self._path(TMP_NAME), "wb")
+
+    def commit(self, etag, size):
+        """Store the frame written through open_incoming() under `etag`."""
+        if isinstance(etag, bytes):
+            etag = etag.decode()
+        name = binascii.hexlify(hashlib.sha1(etag.encode()).digest()[:8]).decode() + ".565"
+        i = self._find(etag)
+        if i >= 0:
+            self._remove(self.entries.pop(i))
+        os.rename(self._path(TMP_NAME), self._path(name))
+        self.entries.append([etag, name, size])
+        self._evict()
+        self._save_index()
+
+    def discard(self):
+        try:
+            os.remove(self._path(TMP_NAME))
+        except OSError:
+            pass
+
+    def reserve(self, size):
+        """Evict old frames until `size` more bytes fit. Returns False if they cannot."""
+        while True:
+            try:
+                st = os.statvfs(self.directory)
+                free = st[0] * st[3]
+            except (OSError, AttributeError):
+                return True
+            if free - size >= MIN_FREE_BYTES:
+                return True
+            if not self.entries:
+                return False
+            self._remove(self.entries.pop(0))
+            self._save_index()
+
+    def _evict(self):
+        total = sum(entry[2] for entry in self.entries)
+        while self.entries and (len(self.entries) > self.max_frames or total > self.max_bytes):
+            entry = self.entries.pop(0)
+            total -= entry[2]
+            self._remove(entry)
+
+    def _remove(self, entry):
+        try:
+            os.remove(self._path(entry[1]))
+        except OSError:
+            pass
+
+
+class TeeReader():
+    """Stream reader that also writes every byte it hands out to `file`."""
+
+    def __init__(self, reader, file):
+        self.reader = reader
+        self.file = file
+        self.written = 0
+
+    def readinto(self, buf):
+        n = self.reader.readinto(buf)
+        self.file.write(buf if n == len(buf) else memoryview(buf)[:n])
+        self.written += n
+        return n
@@ -0,0 +1,110 @@
+import _thread
+import time
+
+from ili9341 import STREAM_CHUNK_MAX, readinto_full
+
+# Stack for the receive thread; inflating and TLS reads need more than the default
+RECEIVE_STACK_SIZE = 16 * 1024
+
+
+class FramePipe():
+    """Double-buffered frame drawing: one thread receives, the caller pushes SPI.
+
+    A background thread fills one of two preallocated buffers with
+    stream.readinto while the calling thread streams the other one to the
+    panel inside a single address window. Buffers are handed over through
+    the `filled` slots (byte count, 0 = free) rather than locks, since an
+    ESP32 _thread lock can only be released by the thread holding it.
+
+    After each draw, `last_stats` holds the receive and SPI time (ms) and
+    how much of it the overlap hid: receive_ms + spi_ms - total_ms.
+    """
+
+    def __init__(self, display, width=320, height=240):
+        self.display = display
+        self.width = width
+        self.height = height
+        rows = max(1, min(height, STREAM_CHUNK_MAX // 2 // (width * 2)))
+        self.bufs = (bytearray(rows * width * 2), bytearray(rows * width * 2))
+        self.mvs = (memoryview(self.bufs[0]), memoryview(self.bufs[1]))
+        self.filled = [0, 0]
+        self.error = None
+        self.abort = False
+        self.receiving = False
+        self.receive_ms = 0
+        self.last_stats = None
+
+    def _receive(self, stream, total):
+        chunk_size = len(self.bufs[0])
+        receive_ms = 0
+        i = 0
+        try:
+            while total > 0 and not self.abort:
+                if self.filled[i]:
+                    time.sleep_ms(1)
+                    continue
+                n = min(chunk_size, total)
+                start = time.ticks_ms()
+                readinto_full(stream, self.bufs[i] if n == chunk_size else self.mvs[i][:n])
+                receive_ms += time.ticks_diff(time.ticks_ms(), start)
+                self.filled[i] = n
+                total -= n
+                i ^= 1
+        except Exception as e:
+            self.error = e
+        self.receive_ms = receive_ms
+        self.receiving = False
+
+    def draw(self, stream, x=0, y=0):
+        """Draw a width x height RGB565 frame read from stream.readinto.
+
+        Short reads are retried until each buffer is full; a stream that
+        ends early raises ValueError. Returns the timing stats, also kept in
+        last_stats. Errors raised by the stream are re-raised here once the
+        receiver stopped.
+        """
+        display = self.display
+        total = self.width * self.height * 2
+        self.filled[0] = self.filled[1] = 0
+        self.error = None
+        self.abort = False
+        self.receiving = True
+        start = time.ticks_ms()
+        previous_stack = _thread.stack_size(RECEIVE_STACK_SIZE)
+        try:
+            _thread.start_new_thread(self._receive, (stream, total))
+        except Exception:
+            self.receiving = False
+            raise
+        finally:
+            _thread.stack_size(previous_stack)
+        spi_ms = 0
+        i = 0
+        display.begin_window(x, y, x + self.width - 1, y + self.height - 1)
+        try:
+            while total > 0 and self.error is None:
+                n = self.filled[i]
+                if not n:
+                    time.sleep_ms(1)
+                    continue
+                spi_start = time.ticks_ms()
+                display.stream(self.bufs[i] if n == len(self.bufs[i]) else self.mvs[i][:n])
+                spi_ms += time.ticks_diff(time.ticks_ms(), spi_start)
+                self.filled[i] = 0
+                total -= n
+                i ^= 1
+        finally:
+            display.end_window()
+            self.abort = True
+            while self.receiving:
+                time.sleep_ms(1)
+        if self.error is not None:
+            raise self.error
+        total_ms = time.ticks_diff(time.ticks_ms(), start)
+        self.last_stats = {
+            'total_ms': total_ms,
+            'receive_ms': self.receive_ms,
+            'spi_ms': spi_ms,
+            'hidden_ms': max(0, self.receive_ms + spi_ms - total_ms),
+        }
+        return self.last_stats
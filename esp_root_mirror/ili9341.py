@@ -1,9 +1,14 @@
 """ILI9341 LCD/Touch module."""
 from time import sleep
+import gc
 from math import cos, sin, pi, radians
 from sys import implementation
 from framebuf import FrameBuffer, RGB565  # type: ignore
 from micropython import const  # type: ignore
+import micropython  # type: ignore
+
+# Upper bound for the chunk buffer of windowed draws (see Display.chunk_rows)
+STREAM_CHUNK_MAX = const(16384)
 
 
 def color565(r, g, b):
@@ -17,6 +22,33 @@ def color565(r, g, b):
     return (r & 0xf8) << 8 | (g & 0xfc) << 3 | b >> 3
 
 
+def readinto_full(stream, buf):
+    """Fill `buf` from stream.readinto, which may return short reads.
+
+    Raises:
+        ValueError: The stream ended before buf was full.
+    """
+    mv = memoryview(buf)
+    pos = 0
+    n = len(mv)
+    while pos < n:
+        read = stream.readinto(mv[pos:] if pos else mv)
+        if not read:
+            raise ValueError("Stream ended before the frame was complete.")
+        pos += read
+
+
+@micropython.viper
+def _double_pixels(src: ptr16, dst: ptr16, n: int):
+    """Write each of `n` RGB565 words from src twice into dst."""
+    i = 0
+    while i < n:
+        v = src[i]
+        dst[i << 1] = v
+        dst[(i << 1) + 1] = v
+        i += 1
+
+
 class Display(object):
     """Serial interface for 16-bit color (5-6-5 RGB) IL9341 display.
 
@@ -130,6 +162,8 @@ class Display(object):
             self.reset = self.reset_cpy
             self.write_cmd = self.write_cmd_cpy
             self.write_data = self.write_data_cpy
+            self.select_data = self.select_data_cpy
+            self.deselect = self.deselect_cpy
         else:
             self.cs.init(self.cs.OUT, value=1)
             self.dc.init(self.dc.OUT, value=0)
@@ -137,6 +171,8 @@ class Display(object):
             self.reset = self.reset_mpy
             self.write_cmd = self.write_cmd_mpy
             self.write_data = self.write_data_mpy
+            self.select_data = self.select_data_mpy
+            self.deselect = self.deselect_mpy
         self.reset()
         # Send initialization commands
         self.write_cmd(self.SWRESET)  # Software reset
@@ -188,6 +224,52 @@ class Display(object):
         self.write_cmd(self.WRITE_RAM)
         self.write_data(data)
 
+    def begin_window(self, x0, y0, x1, y1):
+        """Set the address window once and hold DC/CS for pixel data.
+
+        Args:
+            x0 (int):  Starting X position.
+            y0 (int):  Starting Y position.
+            x1 (int):  Ending X position.
+            y1 (int):  Ending Y position.
+        Note:
+            Follow with any number of stream() calls and finish with
+            end_window().  The panel advances through the window on its
+            own, so buffers do not have to line up with rows.
+        """
+        self.write_cmd(self.SET_COLUMN,
+                       x0 >> 8, x0 & 0xff, x1 >> 8, x1 & 0xff)
+        self.write_cmd(self.SET_PAGE,
+                       y0 >> 8, y0 & 0xff, y1 >> 8, y1 & 0xff)
+        self.write_cmd(self.WRITE_RAM)
+        self.select_data()
+
+    def stream(self, buf):
+        """Push pixel data into the window opened by begin_window().
+
+        Args:
+            buf (bytes): RGB565 data of any length.
+        """
+        self.spi.write(buf)
+
+    def end_window(self):
+        """Release CS after a begin_window()/stream() sequence."""
+        self.deselect()
+
+    def chunk_rows(self, w, h):
+        """Rows per chunk buffer for a windowed draw, sized from free heap.
+
+        Args:
+            w (int): Width of the drawn area.
+            h (int): Height of the drawn area.
+        Returns:
+            int: Between 1 and h rows, at most a quarter of the free heap
+            and STREAM_CHUNK_MAX bytes.
+        """
+        gc.collect()
+        budget = min(gc.mem_free() // 4, STREAM_CHUNK_MAX)
+        return max(1, min(h, budget // (w * 2)))
+
     def cleanup(self):
         """Clean up resources."""
         self.clear()
@@ -218,8 +300,12 @@ class Display(object):
             line = color.to_bytes(2, 'big') * (w * hlines)
         else:
             line = bytearray(w * 2 * hlines)
-        for y in range(0, h, hlines):
-            self.block(0, y, w - 1, y + hlines - 1, line)
+        self.begin_window(0, 0, w - 1, h - 1)
+        try:
+            for y in range(0, h, hlines):
+                self.stream(line)
+        finally:
+            self.end_window()
 
     def display_off(self):
         """Turn display off."""
@@ -352,23 +438,34 @@ class Display(object):
         if self.is_off_grid(x, y, x2, y2):
             return
         with open(path, "rb") as f:
-            chunk_height = 1024 // w
-            chunk_count, remainder = divmod(h, chunk_height)
-            chunk_size = chunk_height * w * 2
-            chunk_y = y
-            if chunk_count:
-                for c in range(0, chunk_count):
-                    buf = f.read(chunk_size)
-                    self.block(x, chunk_y,
-                               x2, chunk_y + chunk_height - 1,
-                               buf)
-                    chunk_y += chunk_height
-            if remainder:
-                buf = f.read(remainder * w * 2)
-                self.block(x, chunk_y,
-                           x2, chunk_y + remainder - 1,
-                           buf)
+            self.draw_from_raw_stream(f, x, y, w, h)
     
+    def draw_image_section(self, path, x, y, w, h, image_width=320):
+        """Redraw part of a full raw RGB565 image from flash, in place.
+
+        Args:
+            path (string): Image file path.
+            x (int): X coordinate of the section, in image and screen.
+            y (int): Y coordinate of the section, in image and screen.
+            w (int): Width of the section.
+            h (int): Height of the section.
+            image_width (int): Width of the stored image.  Default is 320.
+        """
+        x2 = x + w - 1
+        y2 = y + h - 1
+        if self.is_off_grid(x, y, x2, y2):
+            return
+        row = bytearray(w * 2)
+        with open(path, "rb") as f:
+            self.begin_window(x, y, x2, y2)
+            try:
+                for row_y in range(y, y2 + 1):
+                    f.seek((row_y * image_width + x) * 2)
+                    f.readinto(row)
+                    self.stream(row)
+            finally:
+                self.end_window()
+
     def draw_image_from_buff(self, buff, x=0, y=0, w=320, h=240):
         """Draw image from flash.
 
@@ -383,20 +480,15 @@ class Display(object):
         y2 = y + h - 1
         if self.is_off_grid(x, y, x2, y2):
             return
-        chunk_height = 1024 // w
-        chunk_count, remainder = divmod(h, chunk_height)
-        chunk_size = chunk_height * w * 2
-        chunk_y = y
-        if chunk_count:
-            for c in range(0, chunk_count):
-                self.block(x, chunk_y,
-                           x2, chunk_y + chunk_height - 1,
-                           buff.read(chunk_size))
-                chunk_y += chunk_height
-        if remainder:
-            self.block(x, chunk_y,
-                       x2, chunk_y + remainder - 1,
-                       buff.read(chunk_size))
+        chunk_size = self.chunk_rows(w, h) * w * 2
+        remaining = w * h * 2
+        self.begin_window(x, y, x2, y2)
+        try:
+            while remaining > 0:
+                self.stream(buff.read(min(chunk_size, remaining)))
+                remaining -= chunk_size
+        finally:
+            self.end_window()
 
     def draw_image_from_list(self, buff, x=0, y=0, w=320, h=240):
         x2 = x + w - 1
@@ -424,29 +516,91 @@ class Display(object):
                        istream)
 
     def draw_from_pixel_stream(self, pixel_stream, x=0, y=0, w=320, h=240):
+        if hasattr(pixel_stream, 'readinto'):
+            # Readers that produce RGB565 bytes skip the per-pixel int path
+            return self.draw_from_raw_stream(pixel_stream, x, y, w, h)
         x2 = x + w - 1
         y2 = y + h - 1
         if self.is_off_grid(x, y, x2, y2):
             return
-        chunk_height = 1024 // w
-        chunk_count, remainder = divmod(h, chunk_height)
-        chunk_size = chunk_height * w
-        chunk_y = y
-        current_position = 0
-        if chunk_count:
-            for c in range(0, chunk_count):
-                istream = b''.join(i.to_bytes(2, 'big') for i in pixel_stream.read_pixels(chunk_size))
-                self.block(x, chunk_y,
-                           x2, chunk_y + chunk_height - 1,
-                           istream)
-                current_position += chunk_size
-                chunk_y += chunk_height
-        if remainder:
-            istream = b''.join(i.to_bytes(2, 'big') for i in pixel_stream.read_pixels(chunk_size))
-            self.block(x, chunk_y,
-                       x2, chunk_y + remainder - 1,
-                       istream)
-        
+        chunk_size = (1024 // w) * w
+        remaining = w * h
+        self.begin_window(x, y, x2, y2)
+        try:
+            while remaining > 0:
+                self.stream(b''.join(i.to_bytes(2, 'big') for i in pixel_stream.read_pixels(min(chunk_size, remaining))))
+                remaining -= chunk_size
+        finally:
+            self.end_window()
+
+    def draw_from_raw_stream(self, stream, x=0, y=0, w=320, h=240):
+        """Draw raw RGB565 pixels read from a stream.
+
+        Args:
+            stream: Object with readinto(buf) returning the number of pixel
+                bytes read; short reads are retried until each chunk is full.
+            x (int): X coordinate of image left.  Default is 0.
+            y (int): Y coordinate of image top.  Default is 0.
+            w (int): Width of image.  Default is 320.
+            h (int): Height of image.  Default is 240.
+        """
+        x2 = x + w - 1
+        y2 = y + h - 1
+        if self.is_off_grid(x, y, x2, y2):
+            return
+        buf = bytearray(self.chunk_rows(w, h) * w * 2)
+        chunk_size = len(buf)
+        remaining = w * h * 2
+        self.begin_window(x, y, x2, y2)
+        try:
+            while remaining >= chunk_size:
+                readinto_full(stream, buf)
+                self.stream(buf)
+                remaining -= chunk_size
+            if remaining:
+                mv = memoryview(buf)[:remaining]
+                readinto_full(stream, mv)
+                self.stream(mv)
+        finally:
+            self.end_window()
+
+    def draw_from_progressive_stream(self, stream, x=0, y=0, w=320, h=240):
+        """Draw a progressive RGB565 frame pass by pass.
+
+        Args:
+            stream: ProgressiveStreamReader (or any object with readinto).
+            x (int): X coordinate of image left.  Default is 0.
+            y (int): Y coordinate of image top.  Default is 0.
+            w (int): Width of image (even).  Default is 320.
+            h (int): Height of image (even).  Default is 240.
+        Note:
+            Pass 1 is a half resolution image drawn as 2x2 blocks, pass 2
+            the odd rows and pass 3 the even rows at full resolution.
+        """
+        x2 = x + w - 1
+        y2 = y + h - 1
+        if self.is_off_grid(x, y, x2, y2):
+            return
+        row_size = w * 2
+        half = bytearray(w)
+        rows = bytearray(row_size * 2)
+        row = memoryview(rows)[:row_size]
+        # Pass 1: every half width pixel doubled horizontally and vertically
+        self.begin_window(x, y, x2, y2)
+        try:
+            for row_y in range(y, y2, 2):
+                readinto_full(stream, half)
+                _double_pixels(half, rows, w >> 1)
+                rows[row_size:] = row
+                self.stream(rows)
+        finally:
+            self.end_window()
+        # Passes 2 and 3: full resolution odd rows, then even rows
+        for first_row in (y + 1, y):
+            for row_y in range(first_row, y2 + 1, 2):
+                readinto_full(stream, row)
+                self.block(x, row_y, x2, row_y, row)
+
     def draw_letter(self, x, y, letter, font, color, background=0,
                     landscape=False, rotate_180=False):
         """Draw a letter.
@@ -1139,6 +1293,28 @@ class Display(object):
         self.spi.write(data)
         self.cs(1)
 
+    def select_data_mpy(self):
+        """Assert DC (data) and CS for a streamed write (MicroPython)."""
+        self.dc(1)
+        self.cs(0)
+
+    def deselect_mpy(self):
+        """Release CS after a streamed write (MicroPython)."""
+        self.cs(1)
+
+    def select_data_cpy(self):
+        """Assert DC (data) and CS and lock SPI for a streamed write (CircuitPython)."""
+        self.dc.value = True
+        self.cs.value = False
+        # Confirm SPI locked before writing
+        while not self.spi.try_lock():
+            pass
+
+    def deselect_cpy(self):
+        """Unlock SPI and release CS after a streamed write (CircuitPython)."""
+        self.spi.unlock()
+        self.cs.value = True
+
     def write_data_cpy(self, data):
         """Write data to OLED (CircuitPython).
 
@@ -7,35 +7,94 @@ import ui_handler
 import network
 import machine
 import json
+import asyncio
+
+# Incoming MQTT messages are polled this often; the CPU idles in between
+MQTT_POLL_MS = 100
+LOGIN_RETRY_S = 5
+# When > 0, machine.lightsleep() this long between polls instead of idling
+# awake. Off by default: explicit lightsleep powers the radio down, so
+# beacons, RENEW publishes and keep-alive replies are missed until the
+# next wake. Idle power comes from the asyncio idle path plus WiFi modem
+# sleep (PM_POWERSAVE below) instead; only enable this after measuring it.
+LIGHTSLEEP_MS = 0
+STATS_INTERVAL_S = 60
 
 group_id = -1
 login_info = None
 is_logged_in = False
 portraitname = f"retrato_{machine.unique_id().hex()[:10]}"
 ui = ui_handler.UI_handler(machine_name=portraitname)
+# Last frame from flash while WiFi, MQTT and login come up
+ui.draw_cached_frame()
 
 wlan = network.WLAN(network.STA_IF)
 if not wlan.isconnected():
     ui.setup_network()
+try:
+    # Let the radio doze between beacons while the CPU idles
+    wlan.config(pm=wlan.PM_POWERSAVE)
+except (AttributeError, ValueError):
+    pass
 
 from umqtt.robust import MQTTClient
 
-curr_image_url = ""
-new_image = False
+login_event = asyncio.Event()
+render_event = asyncio.Event()
+touch_flag = asyncio.ThreadSafeFlag()
+
+
+class RuntimeStats():
+    """CPU duty cycle (time spent in task work over wall time) and touch
+    wake latency (touch interrupt to handler start), printed periodically."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.started = time.ticks_us()
+        self.busy_us = 0
+        self.wakes = 0
+        self.wake_us_total = 0
+        self.wake_us_max = 0
+
+    def busy(self, since):
+        self.busy_us += time.ticks_diff(time.ticks_us(), since)
+
+    def woke(self, touch_event):
+        latency = time.ticks_diff(time.ticks_us(), touch_event[2])
+        self.wakes += 1
+        self.wake_us_total += latency
+        self.wake_us_max = max(self.wake_us_max, latency)
+
+    def report(self):
+        elapsed = time.ticks_diff(time.ticks_us(), self.started)
+        duty = 100 * self.busy_us / elapsed if elapsed > 0 else 0
+        print("duty cycle {:.1f}% over {} s".format(duty, elapsed // 1000000))
+        if self.wakes:
+            print("touch wake latency avg {} us, max {} us ({} touches)".format(
+                self.wake_us_total // self.wakes, self.wake_us_max, self.wakes))
+        self.reset()
+
+
+stats = RuntimeStats()
+
 
 def sub_cb(topic, msg):
-    global new_image, curr_image_url, login_info
+    global login_info
     print((topic,msg))
     if(topic == b"portrait/group/{}".format(group_id)):
         print("received update_request")
         if(msg == b'RENEW'):
-            new_image = True
+            render_event.set()
     if(topic == b"portrait/login/{}".format(portraitname)):
         print("received group_id")
         login_info = json.loads(msg)
+        login_event.set()
+
 
 with open("mqtt.json", 'rb') as f:
-    mc = json.load(f)    
+    mc = json.load(f)
     mqtt = MQTTClient(portraitname, mc['broker'], port=mc['port'], user=mc['user'], password=mc['password'])
 
 mqtt.set_callback(sub_cb)
@@ -45,28 +104,81 @@ if not mqtt.connect():
     print("New session being set up")
     mqtt.subscribe(f"portrait/login/{portraitname}")
     mqtt.subscribe("retrato/image_url")
-    
-
-last_login_request = 0
-
-while 1:
-    mqtt.check_msg()
-    if(is_logged_in):
-        if(new_image):
-            print("drawing image")
-            ui.update_image()
-            new_image = False
-        if ui.wants_skip:
+
+# Queued touches wake touch_task
+ui.touch.int_handler = touch_flag.set
+if LIGHTSLEEP_MS:
+    import esp32
+    # Touch controller pulls its interrupt line low on a press
+    esp32.wake_on_ext0(pin=ui.touch.int_pin, level=esp32.WAKEUP_ALL_LOW)
+
+
+async def mqtt_task():
+    while True:
+        start = time.ticks_us()
+        mqtt.check_msg()
+        if is_logged_in and ui.wants_skip:
             mqtt.publish(f"portrait/skip/{group_id}", b'SKIP')
             ui.wants_skip = False
-    elif(not login_info):
-        if(time.time() - last_login_request > 5):
-            last_login_request = time.time()
-            mqtt.publish(f"portrait/device/{portraitname}", b"LOGIN")
-    else:
-        group_id = login_info['groupid']
-        ui.api_url = login_info['api_url']
-        print(f"loggin in to group {group_id}")
-        mqtt.subscribe(f'portrait/group/{group_id}')
+        stats.busy(start)
+        if LIGHTSLEEP_MS and not render_event.is_set() and not ui.touch.queue_len:
+            machine.lightsleep(LIGHTSLEEP_MS)
+            if machine.wake_reason() == machine.PIN_WAKE:
+                # The edge that woke us does not reach the pin IRQ
+                ui.touch.sample_now()
+            await asyncio.sleep_ms(0)
+        else:
+            await asyncio.sleep_ms(MQTT_POLL_MS)
+
+
+async def login_task():
+    global group_id, is_logged_in
+    while not login_info:
+        mqtt.publish(f"portrait/device/{portraitname}", b"LOGIN")
+        try:
+            await asyncio.wait_for(login_event.wait(), LOGIN_RETRY_S)
+        except asyncio.TimeoutError:
+            pass
+    group_id = login_info['groupid']
+    ui.api_url = login_info['api_url']
+    print(f"loggin in to group {group_id}")
+    mqtt.subscribe(f'portrait/group/{group_id}')
+    is_logged_in = True
+    render_event.set()
+
+
+async def render_task():
+    while True:
+        await render_event.wait()
+        render_event.clear()
+        print("drawing image")
+        start = time.ticks_us()
         ui.update_image()
-        is_logged_in = True
\ No newline at end of file
+        stats.busy(start)
+
+
+async def touch_task():
+    while True:
+        await touch_flag.wait()
+        start = time.ticks_us()
+        ui.process_touches(on_event=stats.woke)
+        stats.busy(start)
+
+
+async def stats_task():
+    while True:
+        await asyncio.sleep(STATS_INTERVAL_S)
+        stats.report()
+
+
+async def main():
+    asyncio.create_task(mqtt_task())
+    asyncio.create_task(render_task())
+    asyncio.create_task(touch_task())
+    asyncio.create_task(stats_task())
+    await login_task()
+    while True:
+        await asyncio.sleep(3600)
+
+
+asyncio.run(main())
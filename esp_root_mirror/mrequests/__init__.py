@@ -2,6 +2,8 @@ from .mrequests import (
     MAX_READ_SIZE,
     RequestContext,
     Response,
+    Session,
+    SocketReader,
     delete,
     encode_basic_auth,
     get,
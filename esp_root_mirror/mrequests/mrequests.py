@@ -10,6 +10,14 @@ except ImportError:
 
 MICROPY = sys.implementation.name == "micropython"
 MAX_READ_SIZE = 4 * 1024
+# Largest unread body Response.close() will read through to keep a connection
+MAX_DRAIN_SIZE = 16 * 1024
+# Per connection read buffer and initial size of its reusable line buffer
+READ_BUFFER_SIZE = 512
+LINE_BUFFER_SIZE = 256
+# First letters of the header lines Response._parse_header (and redirects) use,
+# as ints: MicroPython's `int in bytes` raises TypeError
+_HEADER_INITIALS = tuple(b"CEcelLtT")
 
 
 def encode_basic_auth(user, password):
@@ -130,59 +138,254 @@ class RequestContext:
                 self.path = self.path.rsplit("/", 1)[0] + "/" + path
 
 
+class SocketReader:
+    """Buffered reads over a socket (or CPython socket file).
+
+    Lines are scanned out of a READ_BUFFER_SIZE byte buffer into a reusable
+    line buffer, so headers cost one socket read per buffer instead of one
+    per byte. Reads larger than the buffer go straight into the caller's
+    buffer once it is empty. Writes are passed through. One reader belongs
+    to one connection, for as long as the connection is kept alive.
+    """
+
+    def __init__(self, sf):
+        self._sf = sf
+        self._buf = bytearray(READ_BUFFER_SIZE)
+        self._mv = memoryview(self._buf)
+        self._pos = 0
+        self._end = 0
+        self.line = bytearray(LINE_BUFFER_SIZE)
+        # Buffer fills must not wait for more bytes than the peer sent, but
+        # MicroPython stream reads never return short: pick a read that does.
+        if hasattr(sf, "readinto1"):
+            self._read_some = sf.readinto1
+        elif hasattr(sf, "recv_into"):
+            self._read_some = sf.recv_into
+        elif hasattr(sf, "recv"):
+            self._read_some = self._recv_into
+        else:
+            self._read_some = self._readinto_byte
+
+    def _recv_into(self, buf):
+        data = self._sf.recv(len(buf))
+        buf[:len(data)] = data
+        return len(data)
+
+    def _readinto_byte(self, buf):
+        return self._sf.readinto(buf, 1)
+
+    def _fill(self):
+        self._pos = 0
+        self._end = self._read_some(self._buf) or 0
+        return self._end
+
+    def readline_into(self):
+        """Read a line, including its line break, into self.line.
+
+        Returns the length of the line, 0 at EOF.
+        """
+        line = self.line
+        limit = len(line)
+        buf = self._buf
+        n = 0
+
+        while True:
+            if self._pos >= self._end and not self._fill():
+                return n
+
+            pos = self._pos
+            end = self._end
+
+            while pos < end:
+                c = buf[pos]
+                pos += 1
+
+                if n == limit:
+                    if limit >= MAX_READ_SIZE:
+                        raise ValueError("Line exceeds %i bytes." % MAX_READ_SIZE)
+                    # Replaced rather than extended, callers may hold a memoryview of it
+                    self.line = line = line + bytearray(limit)
+                    limit += limit
+
+                line[n] = c
+                n += 1
+
+                if c == 10:
+                    self._pos = pos
+                    return n
+
+            self._pos = pos
+
+    def readline(self):
+        n = self.readline_into()
+        return bytes(memoryview(self.line)[:n])
+
+    def read(self, size):
+        """Read `size` bytes, fewer only at EOF."""
+        data = b""
+
+        while len(data) < size:
+            if self._pos >= self._end:
+                if size - len(data) >= READ_BUFFER_SIZE:
+                    chunk = self._sf.read(size - len(data))
+                    if not chunk:
+                        break
+                    data += chunk
+                    continue
+                if not self._fill():
+                    break
+
+            n = min(size - len(data), self._end - self._pos)
+            data += self._mv[self._pos:self._pos + n]
+            self._pos += n
+
+        return data
+
+    def readinto(self, buf, size=0):
+        """Read up to `size` (default len(buf)) bytes into buf.
+
+        Buffered bytes are copied first; with an empty buffer the socket
+        reads straight into buf.
+        """
+        size = size or len(buf)
+        avail = self._end - self._pos
+
+        if avail:
+            n = min(avail, size)
+            buf[:n] = self._mv[self._pos:self._pos + n]
+            self._pos += n
+            return n
+
+        if size < len(buf):
+            buf = memoryview(buf)[:size]
+
+        return self._sf.readinto(buf) or 0
+
+    def write(self, data):
+        return self._sf.write(data)
+
+    def flush(self):
+        self._sf.flush()
+
+    def close(self):
+        self._sf.close()
+
+
 class Response:
     def __init__(self, sock, sockfile, save_headers=False):
         self._cached = None
         self._chunk_size = 0
+        self._chunks_done = False
         self._content_size = 0
+        self._keep_alive = True
+        self._pool_key = None
+        self._remaining = None
+        self._session = None
         self._sf = sockfile
         self._sock = sock
         self.chunked = False
+        self.content_encoding = None
+        self.content_type = None
         self.encoding = "utf-8"
+        self.etag = None
         self.headers = [] if save_headers else None
         self.reason = ""
         self.status_code = None
 
-    def read(self, size=MAX_READ_SIZE):
+    def _next_chunk(self):
+        """Read the next chunk size line. Returns False at the end of the body."""
+        if self._chunks_done:
+            return False
+
         sf = self._sf
+        n = sf.readline_into()
+        l = bytes(memoryview(sf.line)[:n]).strip()
 
-        if self.chunked:
-            if self._chunk_size == 0:
-                l = sf.readline().strip()
+        if not l:
+            return False
 
-                if not l:
-                    return b''
+        # ignore chunk extensions
+        l = l.split(b";", 1)[0]
+        self._chunk_size = max(0, int(l, 16))
 
-                # ignore chunk extensions
-                l = l.split(b";", 1)[0]
-                self._chunk_size = max(0, int(l, 16))
+        if self._chunk_size == 0:
+            # End of message
+            sep = sf.read(2)
 
-                if self._chunk_size == 0:
-                    # End of message
-                    sep = sf.read(2)
+            if sep != b"\r\n":
+                raise ValueError("Expected final chunk separator, read %r instead." % sep)
 
-                    if sep != b"\r\n":
-                        raise ValueError("Expected final chunk separator, read %r instead." % sep)
+            self._chunks_done = True
+            return False
 
-                    return b""
+        return True
 
-            data = sf.read(min(size or MAX_READ_SIZE, self._chunk_size))
-            self._chunk_size = max(0, self._chunk_size - len(data))
+    def _consumed_chunk(self, num_read):
+        self._chunk_size = max(0, self._chunk_size - num_read)
 
-            if self._chunk_size == 0:
-                sep = sf.read(2)
-                if sep != b"\r\n":
-                    raise ValueError("Expected chunk separator, read %r instead." % sep)
+        if self._chunk_size == 0:
+            sep = self._sf.read(2)
+            if sep != b"\r\n":
+                raise ValueError("Expected chunk separator, read %r instead." % sep)
 
+    def read(self, size=MAX_READ_SIZE):
+        sf = self._sf
+
+        if self.chunked:
+            if self._chunk_size == 0 and not self._next_chunk():
+                return b""
+
+            data = sf.read(min(size or MAX_READ_SIZE, self._chunk_size))
+            self._consumed_chunk(len(data))
             return data
-        else:
+        elif self._remaining is None:
             return sf.read(size if size else self._content_size)
+        else:
+            # Never read past the body, the connection may carry another response
+            size = min(size, self._remaining) if size else self._remaining
+            data = sf.read(size) if size else b""
+            self._remaining -= len(data)
+            return data
 
     def readinto(self, buf, size=0):
-        if size:
-            return self._sf.readinto(buf, size)
-        else:
-            return self._sf.readinto(buf)
+        """Read body bytes into buf, decoding chunked transfer encoding.
+
+        Returns the number of bytes read, 0 at the end of the body.
+        """
+        if self.chunked:
+            if self._chunk_size == 0 and not self._next_chunk():
+                return 0
+
+            num_read = self._sf.readinto(buf, min(size or len(buf), self._chunk_size))
+            if num_read:
+                self._consumed_chunk(num_read)
+            return num_read
+
+        if self._remaining is not None:
+            size = min(size or len(buf), self._remaining)
+            if not size:
+                return 0
+
+        num_read = self._sf.readinto(buf, size)
+
+        if self._remaining is not None and num_read:
+            self._remaining -= num_read
+
+        return num_read
+
+    def iter_into(self, buf):
+        """Read the body into `buf` piece by piece, Content-Length or chunked.
+
+        Yields the number of bytes placed at the start of buf each time;
+        buf is overwritten by the next piece.
+        """
+        while True:
+            num_read = self.readinto(buf)
+
+            if not num_read:
+                return
+
+            yield num_read
 
     def save(self, fn, buf=None, chunk_size=0):
         with open(fn, "wb") as fobj:
@@ -192,33 +395,29 @@ class Response:
         num_read_total = 0
 
         if buf:
-            if self.chunked:
-                raise NotImplementedError("Cannot use a buffer when saving a chunked response.")
-            if chunk_size and not MICROPY:
-                raise NotImplementedError("Cannot set chunk_size when using a buffer with CPython."
-                    " Use a buffer or memoryview of appropriate size instead.")
+            mv = memoryview(buf)
 
-        remain = self._content_size
+            if chunk_size:
+                mv = mv[:chunk_size]
 
-        while True:
-            if buf:
-                num_read_chunk = self.readinto(buf, chunk_size)
+            for num_read_chunk in self.iter_into(mv):
+                num_read_total += num_read_chunk
+                fobj.write(mv[:num_read_chunk])
 
-                if not num_read_chunk:
-                    break
+            return num_read_total
 
-                num_read_total += num_read_chunk
-                fobj.write(buf[:num_read_chunk])
-            else:
-                # Read a chunk of data
-                chunk = self.read(size=None if self.chunked
-                                  else min(chunk_size or MAX_READ_SIZE, remain))
-                num_read_total += len(chunk)
+        remain = self._content_size
 
-                if not chunk:
-                    break
+        while True:
+            # Read a chunk of data
+            chunk = self.read(size=None if self.chunked
+                              else min(chunk_size or MAX_READ_SIZE, remain))
+            num_read_total += len(chunk)
+
+            if not chunk:
+                break
 
-                fobj.write(chunk)
+            fobj.write(chunk)
 
             if not self.chunked:
                 remain = self._content_size - num_read_total
@@ -226,15 +425,23 @@ class Response:
                 if remain <= 0:
                     break
 
+        return num_read_total
+
     def _parse_header(self, data):
         if data[:18].lower() == b"transfer-encoding:" and b"chunked" in data[18:]:
             self.chunked = True
             # print("Chunked response detected.")
         elif data[:15].lower() == b"content-length:":
-            self._content_size = int(data[15:])
+            self._content_size = self._remaining = int(data[15:])
             # print("Content length: %i" % self._content_size)
         elif data[:17].lower() == b"content-encoding:":
-            self.encoding = data[17:].decode().strip()
+            self.content_encoding = data[17:].decode().strip()
+        elif data[:13].lower() == b"content-type:":
+            self.content_type = data[13:].decode().split(";", 1)[0].strip()
+        elif data[:5].lower() == b"etag:":
+            self.etag = data[5:].strip()
+        elif data[:11].lower() == b"connection:" and b"close" in data[11:].lower():
+            self._keep_alive = False
 
     # overwrite this method, if you want to process/store headers differently
     def add_header(self, data):
@@ -243,7 +450,43 @@ class Response:
         if self.headers is not None:
             self.headers.append(data.rstrip(b"\r\n"))
 
+    def _drain(self):
+        """Read and discard the rest of the body.
+
+        Returns True if the connection is left at the start of the next
+        response and can be reused.
+        """
+        if not self._keep_alive:
+            return False
+        limit = MAX_DRAIN_SIZE
+
+        if self.chunked:
+            while not self._chunks_done:
+                data = self.read()
+                if not data and not self._chunks_done:
+                    return False
+                limit -= len(data)
+                if limit < 0:
+                    return False
+            return True
+
+        if self._remaining is None or self._remaining > limit:
+            return False
+
+        while self._remaining:
+            if not self.read(self._remaining):
+                return False
+        return True
+
     def close(self):
+        if self._session is not None and self._sock:
+            try:
+                reusable = self._drain()
+            except (OSError, ValueError):
+                reusable = False
+            if reusable:
+                self._session._release(self._pool_key, self._sock, self._sf)
+                self._sock = self._sf = None
         if self._sf and not MICROPY:
             self._sf.close()
             self._sf = None
@@ -256,10 +499,19 @@ class Response:
     def content(self):
         if self._cached is None:
             try:
-                self._cached = self.read(size=None)
+                if self.chunked:
+                    chunks = []
+                    while True:
+                        chunk = self.read()
+                        if not chunk:
+                            break
+                        chunks.append(chunk)
+                    content = b"".join(chunks)
+                else:
+                    content = self.read(size=None)
             finally:
-                self._sock.close()
-                self._sock = None
+                self.close()
+            self._cached = content
         return self._cached
 
     @property
@@ -275,6 +527,54 @@ class Response:
         return json.loads(self.content)
 
 
+def _create_ssl_context():
+    try:
+        import tls as ssl
+    except ImportError:
+        try:
+            import ssl
+        except ImportError:
+            import ussl as ssl
+
+    if hasattr(ssl, "create_default_context"):
+        return ssl.create_default_context()
+
+    ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    if hasattr(ssl, "CERT_OPTIONAL"):
+        ssl_context.verify_mode = ssl.CERT_OPTIONAL
+    return ssl_context
+
+
+def _connect(ai, host, scheme, timeout, ssl_context):
+    """Open a socket to address info `ai`, wrapped with TLS for https.
+
+    Returns (sock, sockfile).
+    """
+    # print("Creating socket...")
+    sock = socket.socket(ai[0], ai[1], ai[2])
+    sock.settimeout(timeout)
+    try:
+        # print("Connecting to %s:%i..." % (host, ai[-1]))
+        sock.connect(ai[-1])
+        if scheme == "https":
+            # print("Wrapping socket with TLS")
+            sock = (ssl_context or _create_ssl_context()).wrap_socket(sock, server_hostname=host)
+    except OSError:
+        sock.close()
+        raise
+
+    return sock, SocketReader(sock if MICROPY else sock.makefile("rwb"))
+
+
+def _close(sock, sf):
+    if not MICROPY:
+        try:
+            sf.close()
+        except:
+            pass
+    sock.close()
+
+
 def request(
     method,
     url,
@@ -287,7 +587,8 @@ def request(
     save_headers=False,
     max_redirects=1,
     timeout=None,
-    ssl_context=None
+    ssl_context=None,
+    session=None
 ):
     if auth:
         headers.update(auth if callable(auth) else encode_basic_auth(auth[0], auth[1]))
@@ -309,37 +610,15 @@ def request(
 
         ctx.redirect = False
 
-        # print("Resolving host address...")
-        ai = socket.getaddrinfo(ctx.host, ctx.port, 0, socket.SOCK_STREAM)[0]
+        if session is not None:
+            sock, sf, reused = session._connection(ctx, timeout, ssl_context)
+        else:
+            # print("Resolving host address...")
+            ai = socket.getaddrinfo(ctx.host, ctx.port, 0, socket.SOCK_STREAM)[0]
+            sock, sf = _connect(ai, ctx.host, ctx.scheme, timeout, ssl_context)
+            reused = False
 
-        # print("Creating socket...")
-        sock = socket.socket(ai[0], ai[1], ai[2])
-        sock.settimeout(timeout)
         try:
-            # print("Connecting to %s:%i..." % (ctx.host, ctx.port))
-            sock.connect(ai[-1])
-            if ctx.scheme == "https":
-                try:
-                    import tls as ssl
-                except ImportError:
-                    try:
-                        import ssl
-                    except ImportError:
-                        import ussl as ssl
-
-
-                # print("Wrapping socket with TLS")
-                if ssl_context is None:
-                    if hasattr(ssl, "create_default_context"):
-                        ssl_context = ssl.create_default_context()
-                    else:
-                        ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
-                        if hasattr(ssl, "CERT_OPTIONAL"):
-                            ssl_context.verify_mode = ssl.CERT_OPTIONAL
-
-                sock = ssl_context.wrap_socket(sock, server_hostname=ctx.host)
-
-            sf = sock if MICROPY else sock.makefile("rwb")
             sf.write(b"%s %s HTTP/1.1\r\n" % (ctx.method.encode("ascii"), ctx.path.encode("ascii")))
             sf.write(b"Host: %s\r\n" % headers.get(b"Host", ctx.host.encode()))
 
@@ -364,7 +643,7 @@ def request(
 
                 sf.write(b"Content-Length: %d\r\n" % len(data))
 
-            sf.write(b"Connection: close\r\n\r\n")
+            sf.write(b"Connection: keep-alive\r\n\r\n" if session is not None else b"Connection: close\r\n\r\n")
 
             if data and ctx.method not in ("GET", "HEAD"):
                 sf.write(data if isinstance(data, bytes) else data.encode(encoding or "utf-8"))
@@ -373,50 +652,57 @@ def request(
                 sf.flush()
 
             resp = response_class(sock, sf, save_headers=save_headers)
-            l = b""
-            while True:
-                l += sf.read(1)
+            # Header lines are only copied out of the line buffer when used
+            copy_all = save_headers or response_class.add_header is not Response.add_header
+            n = sf.readline_into()
 
-                if l.endswith(b"\r\n") or len(l) > MAX_READ_SIZE:
-                    break
+            if not n:
+                raise OSError("Connection closed by server.")
+
+            line_buf = sf.line
+            line = memoryview(line_buf)
 
             # print("Response: %s" % l.decode("ascii"))
-            l = l.split(None, 2)
+            l = bytes(line[:n]).split(None, 2)
             resp.status_code = int(l[1])
 
+            if l[0] != b"HTTP/1.1":
+                resp._keep_alive = False
+
             if len(l) > 2:
                 resp.reason = l[2].rstrip()
 
             while True:
-                l = sf.readline()
-                if not l or l == b"\r\n":
+                n = sf.readline_into()
+                if n <= 2:
                     break
 
+                if sf.line is not line_buf:
+                    # The line buffer grew
+                    line_buf = sf.line
+                    line = memoryview(line_buf)
+
+                if not copy_all and line_buf[0] not in _HEADER_INITIALS:
+                    continue
+
+                l = bytes(line[:n])
+
                 if l.startswith(b"Location:"):
                     ctx.set_location(resp.status_code, l[9:].strip().decode("ascii"))
 
                 # print("Header: %r" % l)
                 resp.add_header(l)
         except OSError:
-            if not MICROPY:
-                try:
-                    sf.close()
-                    del sf
-                except:
-                    pass
-            sock.close()
+            _close(sock, sf)
             del sock
+            if reused:
+                # The server dropped the idle keep-alive connection, retry on a new one
+                continue
             raise
 
         if ctx.redirect:
             # print("Redirect to: %s" % ctx.url)
-            if not MICROPY:
-                try:
-                    sf.close()
-                    del sf
-                except:
-                    pass
-            sock.close()
+            _close(sock, sf)
             del sock
             max_redirects -= 1
 
@@ -425,4 +711,99 @@ def request(
         else:
             break
 
-    return resp
\ No newline at end of file
+    if ctx.method == "HEAD" or resp.status_code in (204, 304) or resp.status_code < 200:
+        # No body, whatever the headers say
+        resp.chunked = False
+        resp._remaining = 0
+
+    if session is not None:
+        resp._session = session
+        resp._pool_key = (ctx.scheme, ctx.host, ctx.port)
+
+    return resp
+
+
+class Session:
+    """Keep-alive connections and cached lookups shared between requests.
+
+    Keeps at most one idle connection per (scheme, host, port). A response
+    hands its connection back when closed, after reading through what is
+    left of its body (chunked or Content-Length, up to MAX_DRAIN_SIZE).
+    getaddrinfo results and the TLS context are created once per session.
+    A request sent on an idle connection the server has meanwhile closed
+    is retried once on a new connection.
+    """
+
+    def __init__(self, headers=None, timeout=None, ssl_context=None):
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        self._addrinfo = {}
+        self._idle = {}
+        self.connects = 0
+        self.reuses = 0
+
+    def request(self, method, url, headers=None, **kw):
+        if self.headers:
+            merged = dict(self.headers)
+            merged.update(headers or {})
+            headers = merged
+        kw.setdefault("timeout", self.timeout)
+        return request(method, url, headers=headers or {}, session=self, **kw)
+
+    def head(self, url, **kw):
+        return self.request("HEAD", url, **kw)
+
+    def get(self, url, **kw):
+        return self.request("GET", url, **kw)
+
+    def post(self, url, **kw):
+        return self.request("POST", url, **kw)
+
+    def put(self, url, **kw):
+        return self.request("PUT", url, **kw)
+
+    def patch(self, url, **kw):
+        return self.request("PATCH", url, **kw)
+
+    def delete(self, url, **kw):
+        return self.request("DELETE", url, **kw)
+
+    def close(self):
+        """Close all idle connections."""
+        for sock, sf in self._idle.values():
+            _close(sock, sf)
+        self._idle = {}
+
+    def _connection(self, ctx, timeout, ssl_context):
+        """Idle connection for ctx's host, or a new one. Returns (sock, sockfile, reused)."""
+        key = (ctx.scheme, ctx.host, ctx.port)
+        idle = self._idle.pop(key, None)
+        if idle is not None:
+            idle[0].settimeout(timeout)
+            self.reuses += 1
+            return idle[0], idle[1], True
+
+        ai = self._addrinfo.get(key[1:])
+        if ai is None:
+            ai = self._addrinfo[key[1:]] = socket.getaddrinfo(ctx.host, ctx.port, 0, socket.SOCK_STREAM)[0]
+
+        if ctx.scheme == "https" and ssl_context is None:
+            if self.ssl_context is None:
+                self.ssl_context = _create_ssl_context()
+            ssl_context = self.ssl_context
+
+        try:
+            sock, sf = _connect(ai, ctx.host, ctx.scheme, timeout, ssl_context)
+        except OSError:
+            # The address may have changed, resolve again next time
+            self._addrinfo.pop(key[1:], None)
+            raise
+        self.connects += 1
+        return sock, sf, False
+
+    def _release(self, key, sock, sf):
+        old = self._idle.pop(key, None)
+        if old is not None:
+            _close(*old)
+        self._idle[key] = (sock, sf)
@@ -1,3 +1,42 @@
+import io
+import micropython
+
+try:
+    import deflate
+except ImportError:
+    deflate = None
+
+# Window size the API compresses frames with (app.render.DEFLATE_WBITS)
+DEFLATE_WBITS = 10
+
+
+@micropython.viper
+def _bgr888_to_rgb565(src: ptr8, dst: ptr8, dst_offset: int, n: int):
+    """Convert `n` BMP pixels from `src` into big-endian RGB565 at dst[dst_offset:].
+
+    Same packing as the per-pixel path in read_pixels (first byte in the
+    high bits, matching the panel's BGR mode).
+    """
+    i = 0
+    j = dst_offset
+    end = n * 3
+    while i < end:
+        c1 = src[i + 1]
+        dst[j] = (src[i] & 0xF8) | (c1 >> 5)
+        dst[j + 1] = ((c1 & 0x1C) << 3) | (src[i + 2] >> 3)
+        i += 3
+        j += 2
+
+
+@micropython.viper
+def _expand_indexed(indices: ptr8, palette: ptr16, dst: ptr16, n: int):
+    """Look up `n` palette indices into RGB565 words (raw byte order kept)."""
+    i = 0
+    while i < n:
+        dst[i] = palette[indices[i]]
+        i += 1
+
+
 def parse_bitmap_stream(stream):
     # BMP Header offsets
     FILE_HEADER_SIZE = 14
@@ -50,7 +89,9 @@ def parse_bitmap_stream(stream):
 
 
 class BMPStreamReader:
-    def __init__(self, stream):
+    def __init__(self, stream, width=None, height=None):
+        """Read a 24-bit BMP. When `width` and `height` are given, a BMP of
+        any other size is rejected with ValueError."""
         self.stream = stream
         
         self.buffer = b""  # Buffer to hold row data
@@ -58,10 +99,13 @@ class BMPStreamReader:
         self.stream_pos = 0  # Current read position in the stream
         
         self.pixel_data_offset, self.row_size, self.width, self.height = self._parse_header()
+        if width is not None and (self.width, self.height) != (width, height):
+            raise ValueError("Expected a {}x{} BMP, got {}x{}".format(width, height, self.width, self.height))
 
         # Initialize state variables
         self.current_row = self.height - 1  # BMP rows are stored bottom to top
         self.current_col = 0
+        self.row_buf = None
         
         # Skip to the pixel data offset
         bytes_to_skip = self.pixel_data_offset - self.stream_pos
@@ -145,7 +189,122 @@ class BMPStreamReader:
 
         return pixels
     
+    def readinto(self, buf):
+        """Fill `buf` with whole rows converted to RGB565. Returns the number of bytes written.
+
+        Rows are read with readinto into one reusable row buffer and converted
+        by a viper kernel, so no per-pixel objects are created.
+        """
+        if self.row_buf is None:
+            self.row_buf = bytearray(self.row_size)
+        row_mv = memoryview(self.row_buf)
+        out_row = self.width * 2
+        written = 0
+        while written + out_row <= len(buf) and self.current_row >= 0:
+            _read_exact(self.stream, row_mv)
+            _bgr888_to_rgb565(self.row_buf, buf, written, self.width)
+            self.current_row -= 1
+            written += out_row
+        return written
+
     def empty_stream(self):
         while self._load_next_row():
             pass
-    
\ No newline at end of file
+    
+
+def _read_exact(stream, mv):
+    """Fill memoryview `mv` from `stream`."""
+    pos = 0
+    n = len(mv)
+    while pos < n:
+        read = stream.readinto(mv[pos:])
+        if not read:
+            raise ValueError("Stream ended prematurely.")
+        pos += read
+
+
+class RGB565StreamReader:
+    """Reader for raw RGB565 frames (big-endian, top row first).
+
+    The bytes are already in the display's pixel format, so they are read
+    straight into the caller's buffer and written to the panel as is.
+    """
+    def __init__(self, stream, width=320, height=240):
+        self.stream = stream
+        self.width = width
+        self.height = height
+        self.remaining = width * height * 2
+
+    def readinto(self, buf):
+        """Fill `buf` with the next pixels. Returns the number of bytes read."""
+        n = min(len(buf), self.remaining)
+        _read_exact(self.stream, memoryview(buf)[:n])
+        self.remaining -= n
+        return n
+
+    def empty_stream(self):
+        buf = bytearray(512)
+        while self.remaining:
+            self.readinto(buf)
+
+
+class IndexedStreamReader:
+    """Reader for palettized frames: a 512-byte RGB565 palette, then one
+    palette index per pixel (top row first).
+
+    readinto expands indices to RGB565 through the palette, so callers get
+    the same bytes a RGB565StreamReader would give them.
+    """
+    def __init__(self, stream, width=320, height=240):
+        self.stream = stream
+        self.width = width
+        self.height = height
+        self.remaining = width * height
+        self.palette = bytearray(512)
+        _read_exact(stream, memoryview(self.palette))
+        self.indices = bytearray(0)
+
+    def readinto(self, buf):
+        """Fill `buf` with the next pixels as RGB565. Returns the number of bytes written."""
+        n = min(len(buf) // 2, self.remaining)
+        if len(self.indices) < n:
+            self.indices = bytearray(n)
+        _read_exact(self.stream, memoryview(self.indices)[:n])
+        _expand_indexed(self.indices, self.palette, buf, n)
+        self.remaining -= n
+        return n * 2
+
+    def empty_stream(self):
+        buf = bytearray(512)
+        while self.remaining:
+            self.readinto(buf)
+
+
+class ProgressiveStreamReader(RGB565StreamReader):
+    """Reader for progressive RGB565 frames.
+
+    The stream holds three passes: the even rows at half width (to be drawn
+    as 2x2 blocks), then the odd rows, then the even rows at full width.
+    Drawn with Display.draw_from_progressive_stream.
+    """
+    def __init__(self, stream, width=320, height=240):
+        super().__init__(stream, width=width, height=height)
+        self.remaining = width * height * 5 // 2
+
+
+class _ResponseStream(io.IOBase):
+    """Exposes a response's readinto to native stream consumers (DeflateIO)."""
+    def __init__(self, response):
+        self.response = response
+
+    def readinto(self, buf):
+        return self.response.readinto(buf)
+
+
+def open_inflated(response):
+    """Wrap a Content-Encoding: deflate response in a stream of inflated bytes.
+
+    Data is inflated as it arrives, inside a fixed 2**DEFLATE_WBITS byte
+    window, so the compressed frame is never held in memory.
+    """
+    return deflate.DeflateIO(_ResponseStream(response), deflate.ZLIB, DEFLATE_WBITS)
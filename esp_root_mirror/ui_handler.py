@@ -7,7 +7,10 @@ import time
 
 import gc
 
-from parse_bitmap import BMPStreamReader
+from frame_cache import FrameCache, TeeReader
+from frame_pipe import FramePipe
+from parse_bitmap import (BMPStreamReader, IndexedStreamReader, ProgressiveStreamReader,
+                          RGB565StreamReader, deflate, open_inflated)
 
 spi1 = SPI(1, baudrate=40000000, sck=Pin(14), mosi=Pin(13))
 spi2 = SPI(2, baudrate=1000000, sck=Pin(25), mosi=Pin(32), miso=Pin(39))
@@ -16,10 +19,31 @@ bl_pin = Pin(21, Pin.OUT)
 WHITE = color565(255, 255, 255)
 BEIGE = color565(224, 209, 175)
 BLACK = color565(0,0,0)
+MENU_WIDTH = 100
 
 # API_BASE_URL = "http://192.168.0.87:8000/api/v1"
 IMAGE_ENDPOINT = "/image"
 QR_ENDPOINT = "/qrcode"
+RGB565_MEDIA_TYPE = "image/x-rgb565"
+INDEXED_MEDIA_TYPE = "image/x-rgb565-indexed"
+PROGRESSIVE_MEDIA_TYPE = "image/x-rgb565-progressive"
+BMP_MEDIA_TYPE = "image/bmp"
+# Frame format requested from the API. INDEXED_MEDIA_TYPE halves the
+# download at the cost of a 256 colour palette; PROGRESSIVE_MEDIA_TYPE shows
+# a coarse frame after a fifth of the download but sends 25% more bytes.
+FRAME_MEDIA_TYPE = RGB565_MEDIA_TYPE
+FRAME_READERS = {
+    RGB565_MEDIA_TYPE: RGB565StreamReader,
+    INDEXED_MEDIA_TYPE: IndexedStreamReader,
+    PROGRESSIVE_MEDIA_TYPE: ProgressiveStreamReader,
+    # What servers that predate the raw formats send
+    BMP_MEDIA_TYPE: BMPStreamReader,
+}
+QR_MATRIX_MEDIA_TYPE = "application/x-qr-matrix"
+HTTP_TIMEOUT = 15
+# Last frames kept on flash as raw RGB565 (320x240 = 153600 bytes each)
+FRAME_CACHE_DIR = "/frames"
+FRAME_CACHE_MAX_FRAMES = 4
 
 def draw_centered_text(display, txt, offset_x=0, offset_y=0):
     display.draw_text8x8(
@@ -30,6 +54,31 @@ def draw_centered_text(display, txt, offset_x=0, offset_y=0):
         background=BLACK
     )
 
+def draw_qr_matrix(display, data):
+    """Draw a packed QR module matrix (side byte + MSB-first rows), centered.
+
+    Dark modules are drawn as horizontal runs, one fill_rectangle per run.
+    """
+    n = data[0]
+    row_bytes = (n + 7) // 8
+    scale = min(display.width, display.height) // n
+    x0 = (display.width - n * scale) // 2
+    y0 = (display.height - n * scale) // 2
+    display.clear(hlines=16)
+    display.fill_rectangle(x0, y0, n * scale, n * scale, WHITE)
+    for row in range(n):
+        offset = 1 + row * row_bytes
+        y = y0 + row * scale
+        run_start = -1
+        for col in range(n + 1):
+            dark = col < n and data[offset + (col >> 3)] & (0x80 >> (col & 7))
+            if dark and run_start < 0:
+                run_start = col
+            elif not dark and run_start >= 0:
+                display.fill_rectangle(x0 + run_start * scale, y,
+                                       (col - run_start) * scale, scale, BLACK)
+                run_start = -1
+
 class Button():
     def __init__(self, x, y, w, h, action, title=""):
         self.x = x
@@ -53,7 +102,7 @@ def new_image_action(ui, button):
     ui.menu_active = False
 
 def open_album_qrcode(ui, button):
-    ui.draw_bitmap_from_url(ui.api_url+QR_ENDPOINT)
+    ui.draw_qr_from_url(ui.api_url+QR_ENDPOINT)
     ui.menu_active = False
 
 def reset_wifi_action(ui, button):
@@ -84,9 +133,20 @@ class UI_handler():
         ]
         self.menu_active = False
         self.cancel_wifi_confirm = False
-        self.touch = Touch(spi2, cs=Pin(33), int_pin=Pin(36), int_handler=self.handle_touch)
+        # Touches are queued by the driver; handle_touch runs from the caller's loop
+        self.touch = Touch(spi2, cs=Pin(33), int_pin=Pin(36))
         self.wants_skip = False
         self.api_url = ""
+        # ETag of the frame currently on screen, None once something covers it
+        self.frame_etag = None
+        # ETag of the frame under the open menu
+        self.menu_covered_etag = None
+        self.frame_pipe = FramePipe(self.display, self.display.width, self.display.height)
+        # Keep-alive connection to api_url shared by the image and QR requests
+        self.session = mrequests.Session(timeout=HTTP_TIMEOUT)
+        frame_size = self.display.width * self.display.height * 2
+        self.frame_cache = FrameCache(FRAME_CACHE_DIR, max_frames=FRAME_CACHE_MAX_FRAMES,
+                                      max_bytes=FRAME_CACHE_MAX_FRAMES * frame_size)
         
     def _itter_buttons(self):
         for button in self.buttons:
@@ -94,8 +154,22 @@ class UI_handler():
                 yield button
     
     def update_image(self):
-        self.draw_bitmap_from_url(self.api_url+IMAGE_ENDPOINT)
+        self.draw_frame_from_url(self.api_url+IMAGE_ENDPOINT)
         
+    def process_touches(self, on_event=None):
+        """Handle every queued touch, oldest first.
+
+        Touches that arrive while one is handled (e.g. during the frame
+        download a menu close triggers) wait in the queue.
+        """
+        while True:
+            event = self.touch.get_event()
+            if event is None:
+                return
+            if on_event is not None:
+                on_event(event)
+            self.handle_touch(event[0], event[1])
+
     def handle_touch(self, x, y):
         '''Process touchscreen press events.'''
         print(f"Display touched on x:{x} y:{y} ")
@@ -104,8 +178,7 @@ class UI_handler():
         if(self.menu_active):
             if(xi >= 110):
                 self.menu_active = False
-                self.display.clear(hlines=16)
-                self.draw_bitmap_from_url(self.api_url+IMAGE_ENDPOINT)
+                self.close_menu()
             for button in self.buttons:
                 if(button.is_target(xi, yi)):
                     self.draw_button(button, True)
@@ -116,29 +189,129 @@ class UI_handler():
             self.menu_active = True
             self.draw_menu()
         
-    # draw_bitmap_from_url
-    def draw_bitmap_from_url(self, url):
-#         print("fetching image from", url)
+    def draw_cached_frame(self, etag=None):
+        """Draw a frame from the flash cache: the one stored under `etag`, or
+        the most recent one. Returns False if it is not cached."""
+        if etag is None:
+            newest = self.frame_cache.newest()
+            if newest is None:
+                return False
+            etag, path = newest
+        else:
+            path = self.frame_cache.get(etag)
+            if path is None:
+                return False
+        try:
+            self.display.draw_image(path, 0, 0, self.display.width, self.display.height)
+        except OSError as e:
+            print(e)
+            return False
+        self._frame_drawn(etag)
+        return True
+
+    def _frame_drawn(self, etag):
+        """Note a full frame on screen; it covers the menu if one was open."""
+        self.frame_etag = etag.decode() if isinstance(etag, bytes) else etag
+        self.menu_active = False
+        self.menu_covered_etag = None
+
+    def draw_frame_from_url(self, url):
+        """Draw a RGB565, palettized or BMP frame, inflating it on the fly when deflated.
+
+        Every cached ETag is sent in If-None-Match, so a frame already on
+        flash comes back as a 304 and is drawn from the cache. Downloaded
+        frames are written to the cache while they are drawn.
+        """
         if not url:
             draw_centered_text(self.display, "Imagem nao encontrada...")
             return False
+        incoming = None
+        r = None
         try:
+            gc.collect()
+            headers = {'accept': FRAME_MEDIA_TYPE, 'machine': self.machine_name}
+            if deflate:
+                headers['accept-encoding'] = 'deflate'
+            etags = self.frame_cache.etags()
+            if self.frame_etag and self.frame_etag not in etags:
+                etags.insert(0, self.frame_etag)
+            if etags:
+                headers['if-none-match'] = ", ".join(etags)
+            r = self.session.get(url, headers=headers)
+            if r.status_code == 304:
+                r.close()
+                etag = r.etag.decode() if r.etag else None
+                if etag is None or etag == self.frame_etag:
+                    # Same frame as the one on screen
+                    return True
+                if self.draw_cached_frame(etag):
+                    return True
+                raise OSError("Frame {} not cached".format(etag))
+            if r.status_code != 200:
+                raise OSError("HTTP {}".format(r.status_code))
+            reader_class = FRAME_READERS.get(r.content_type)
+            if reader_class is None:
+                # Drawing (and caching) it as raw pixels would only show garbage
+                raise OSError("Unsupported frame type {}".format(r.content_type))
+            # The clear wipes the menu along with the old frame
+            self._frame_drawn(None)
             self.display.clear(hlines=16)
             draw_centered_text(self.display, "Carregando imagem...")
+            w, h = self.display.width, self.display.height
+            stream = open_inflated(r) if r.content_encoding == 'deflate' else r
+            frame_reader = reader_class(stream, width=w, height=h)
+            if reader_class is ProgressiveStreamReader:
+                # Passes are not in pixel order, so these frames are not cached
+                self.display.draw_from_progressive_stream(frame_reader, x=0, y=0, w=w, h=h)
+            else:
+                if r.etag and self.frame_cache.reserve(w * h * 2):
+                    incoming = self.frame_cache.open_incoming()
+                    frame_reader = TeeReader(frame_reader, incoming)
+                stats = self.frame_pipe.draw(frame_reader)
+                print("frame drawn in {total_ms} ms, {hidden_ms} ms of receive/SPI overlapped".format(**stats))
+                if incoming is not None:
+                    incoming.close()
+                    incoming = None
+                    self.frame_cache.commit(r.etag, frame_reader.written)
+            self._frame_drawn(r.etag)
+            r.close()
             gc.collect()
-            r = mrequests.get(url, headers={'accept': 'image/bmp', 'machine': self.machine_name})
-            bmp_reader = BMPStreamReader(r)
-            self.display.draw_from_pixel_stream(bmp_reader, x=0,y=0, w=bmp_reader.width, h=bmp_reader.height)
-            bmp_reader.empty_stream()
-            gc.collect()
-        except OSError as e:
+        except Exception as e:
+            # Anything escaping here would end render_task for good
             print(e)
+            if incoming is not None:
+                incoming.close()
+                self.frame_cache.discard()
+            # Keep showing the last good frame instead of the error
+            if self.frame_etag is not None or self.draw_cached_frame():
+                return False
             self.display.clear(hlines=16)
             draw_centered_text(self.display, "Erro ao carregar imagem")
             draw_centered_text(self.display, str(e), offset_y=16)
             return False
+        finally:
+            if r is not None:
+                # A half-read body goes back to the pool only if it drains cleanly; no-op once closed
+                r.close()
         return True
-    
+
+    def draw_qr_from_url(self, url):
+        """Fetch the album QR code as a module matrix and draw it locally."""
+        try:
+            r = self.session.get(url, headers={'accept': QR_MATRIX_MEDIA_TYPE, 'machine': self.machine_name})
+            if r.status_code != 200:
+                r.close()
+                raise OSError("HTTP {}".format(r.status_code))
+            data = r.content
+            draw_qr_matrix(self.display, data)
+        except (OSError, ValueError, IndexError) as e:
+            print(e)
+            self.display.clear(hlines=16)
+            draw_centered_text(self.display, "Erro ao carregar QR")
+            draw_centered_text(self.display, str(e), offset_y=16)
+            return False
+        return True
+
     def draw_button(self, button, pressed):
         print(button)
         bg_color = BEIGE if pressed else WHITE
@@ -150,22 +323,51 @@ class UI_handler():
         self.display.draw_text8x8(xi, yi, button.title, color=WHITE if pressed else BLACK, background=bg_color)
     
     def draw_menu(self):
-        self.display.fill_rectangle(0,0, 100, self.display.height, WHITE)
+        self.menu_covered_etag = self.frame_etag
+        self.frame_etag = None
+        self.display.fill_rectangle(0,0, MENU_WIDTH, self.display.height, WHITE)
         for button in self.buttons:
             self.draw_button(button, False)
             
+    def close_menu(self):
+        """Repaint the strip under the menu from the flash copy of the frame.
+
+        The panel's SPI bus has no MISO line, so the strip cannot be read
+        back with READ_RAM; frames missing from the cache are fetched again.
+        """
+        etag, self.menu_covered_etag = self.menu_covered_etag, None
+        if self.frame_etag is not None:
+            return  # A new frame was drawn over the menu meanwhile
+        path = self.frame_cache.path(etag) if etag else None
+        if path is not None:
+            try:
+                self.display.draw_image_section(path, 0, 0, MENU_WIDTH, self.display.height,
+                                                image_width=self.display.width)
+                self.frame_etag = etag
+                return
+            except OSError as e:
+                print(e)
+        self.display.clear(hlines=16)
+        self.update_image()
+
     def setup_network(self):
         from wifi_setup.wifi_setup import WiFiSetup
         ws = WiFiSetup(self.machine_name)
-        draw_centered_text(self.display, "Configurando Wi-Fi")
+        # A cached frame drawn at boot stays up unless the WiFi needs configuring
+        show_status = self.frame_etag is None
+        if show_status:
+            draw_centered_text(self.display, "Configurando Wi-Fi")
         if not ws.connect():
+            show_status = True
+            self.frame_etag = None
             self.display.clear(hlines=16)
             draw_centered_text(self.display, f"conecte-se na rede", offset_y=-16)
             draw_centered_text(self.display, self.machine_name)
             draw_centered_text(self.display, "para configurar o wifi", offset_y=16)
         sta = ws.connect_or_setup()
         del ws
-        self.display.clear(hlines=16)
-        draw_centered_text(self.display, "Conectado a", offset_y=-16)
-        draw_centered_text(self.display, sta.config("ssid"))
+        if show_status:
+            self.display.clear(hlines=16)
+            draw_centered_text(self.display, "Conectado a", offset_y=-16)
+            draw_centered_text(self.display, sta.config("ssid"))
     
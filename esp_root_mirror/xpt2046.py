@@ -1,5 +1,12 @@
 """XPT2046 Touch module."""
-from time import sleep
+from array import array
+from time import sleep, ticks_diff, ticks_us
+from micropython import schedule
+
+TOUCH_QUEUE_SIZE = const(8)  # Pending touch events kept for the consumer
+_QUEUE_WRAP = const(16)  # Head/tail run modulo 2 * TOUCH_QUEUE_SIZE so full != empty
+DEBOUNCE_US = const(100000)  # Edges closer than this to the previous one are bounce
+COALESCE_PX = const(20)  # A press this close to the newest pending one is merged into it
 
 
 class Touch(object):
@@ -24,7 +31,8 @@ class Touch(object):
             spi (Class Spi):  SPI interface for OLED
             cs (Class Pin):  Chip select pin
             int_pin (Class Pin):  Touch controller interrupt pin
-            int_handler (function): Handler for screen interrupt
+            int_handler (function): Called without arguments, outside of the
+                interrupt, whenever a touch event is queued (see get_event)
             width (int): Width of LCD screen
             height (int): Height of LCD screen
             x_min (int): Minimum x coordinate
@@ -49,13 +57,27 @@ class Touch(object):
         self.y_multiplier = height / (y_max - y_min)
         self.y_add = y_min * -self.y_multiplier
 
+        # Single-producer/single-consumer ring of (x, y, ticks_us) touch
+        # events: only queue_event (scheduler) writes queue_tail and only
+        # get_event (main code) writes queue_head, so neither can undo the
+        # other's update when the scheduler runs in between
+        self.queue_x = array('h', [0] * TOUCH_QUEUE_SIZE)
+        self.queue_y = array('h', [0] * TOUCH_QUEUE_SIZE)
+        self.queue_t = array('i', [0] * TOUCH_QUEUE_SIZE)
+        self.queue_head = 0  # Next event to hand out
+        self.queue_tail = 0  # Next slot to fill
+        self.coalesced = 0
+        self.dropped = 0
+
         if int_pin is not None:
             self.int_pin = int_pin
             self.int_pin.init(int_pin.IN)
             self.int_handler = int_handler
-            self.int_locked = False
+            self.last_edge = ticks_us()
+            # Bound once: the hard IRQ must not allocate
+            self._sample_ref = self._sample
             int_pin.irq(trigger=int_pin.IRQ_FALLING | int_pin.IRQ_RISING,
-                        handler=self.int_press)
+                        handler=self.int_press, hard=True)
 
     def get_touch(self):
         """Take multiple samples to get accurate touch reading."""
@@ -87,18 +109,76 @@ class Touch(object):
         return None
 
     def int_press(self, pin):
-        """Send X,Y values to passed interrupt handler."""
-        if not pin.value() and not self.int_locked:
-            self.int_locked = True  # Lock Interrupt
-            buff = self.raw_touch()
-
-            if buff is not None:
-                x, y = self.normalize(*buff)
-                self.int_handler(x, y)
-            sleep(.1)  # Debounce falling edge
-        elif pin.value() and self.int_locked:
-            sleep(.1)  # Debounce rising edge
-            self.int_locked = False  # Unlock interrupt
+        """Pin IRQ: debounce on timestamps and defer sampling to the scheduler."""
+        now = ticks_us()
+        if ticks_diff(now, self.last_edge) < DEBOUNCE_US:
+            return
+        self.last_edge = now
+        if not pin.value():
+            try:
+                schedule(self._sample_ref, now)
+            except RuntimeError:
+                pass  # Scheduler queue full, the press is lost
+
+    def _sample(self, pressed_at):
+        """Read the touched position and queue it (runs from the scheduler)."""
+        if self.int_pin.value():
+            return  # Released before it could be sampled
+        buff = self.raw_touch()
+        if buff is not None:
+            x, y = self.normalize(*buff)
+            self.queue_event(x, y, pressed_at)
+
+    def sample_now(self):
+        """Sample and queue a press the pin IRQ did not see (e.g. the one
+        that woke the board from lightsleep)."""
+        self._sample(ticks_us())
+
+    @property
+    def queue_len(self):
+        """Number of pending touch events."""
+        return (self.queue_tail - self.queue_head) % _QUEUE_WRAP
+
+    def queue_event(self, x, y, pressed_at):
+        """Add a touch event, merging it into the newest pending one when close.
+
+        Producer side of the ring: writes only queue_tail.
+        """
+        size = TOUCH_QUEUE_SIZE
+        tail = self.queue_tail
+        pending = (tail - self.queue_head) % _QUEUE_WRAP
+        if pending:
+            newest = (tail - 1) % size
+            if (abs(self.queue_x[newest] - x) < COALESCE_PX
+                    and abs(self.queue_y[newest] - y) < COALESCE_PX):
+                self.coalesced += 1
+                return
+        if pending == size:
+            # Full: drop the new event, the head belongs to the consumer
+            self.dropped += 1
+            return
+        i = tail % size
+        self.queue_x[i] = x
+        self.queue_y[i] = y
+        self.queue_t[i] = pressed_at
+        # Publish the slot only once it is written
+        self.queue_tail = (tail + 1) % _QUEUE_WRAP
+        if self.int_handler is not None:
+            self.int_handler()
+
+    def get_event(self):
+        """Oldest pending touch as (x, y, ticks_us of the press), or None.
+
+        Consumer side of the ring: writes only queue_head.
+        """
+        head = self.queue_head
+        if head == self.queue_tail:
+            return None
+        i = head % TOUCH_QUEUE_SIZE
+        event = self.queue_x[i], self.queue_y[i], self.queue_t[i]
+        # Free the slot only once it is read
+        self.queue_head = (head + 1) % _QUEUE_WRAP
+        return event
 
     def normalize(self, x, y):
         """Normalize mean X,Y values to match LCD screen."""